@@ -4,4 +4,5 @@ Contains modules:
 - recording
 - processor
 - player
+- pa_pool
 """
\ No newline at end of file
@@ -1,20 +1,46 @@
-import torch
-from demucs.pretrained import get_model
+import functools
+
+@functools.lru_cache(maxsize=1)
+def _default_device():
+    # torch is imported (and CUDA probed) only when a device is first needed
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
 
 class ModelManager:
     def __init__(self, device=None):
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        self._device = device
+        self._cache = {}
+
+    @property
+    def device(self):
+        if self._device is None:
+            self._device = _default_device()
+        return self._device
 
     def load_model_safely(self, model_name, status_callback=None):
         try:
-            if status_callback:
-                status_callback(f"Loading model {model_name} on {self.device}...")
             if model_name.startswith("mdx"):
                 # MDX is handled in processor; just pass path/name
                 return model_name
-            model = get_model(model_name)
+            key = (model_name, self.device)
+            model = self._cache.get(key)
+            if model is not None:
+                return model
+            if status_callback:
+                status_callback(f"Loading model {model_name} on {self.device}...")
+            from demucs.pretrained import get_model
+            model = get_model(model_name).to(self.device).eval()
+            self._cache[key] = model
             return model
         except Exception as e:
             if status_callback:
                 status_callback(f"Error loading model {model_name}: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def clear_cache(self):
+        """Drop cached models so their device memory can be released."""
+        had_models = bool(self._cache)
+        self._cache.clear()
+        if had_models and self._device == "cuda":
+            import torch
+            torch.cuda.empty_cache()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import threading
+import pyaudio
+
+# Process-wide PyAudio instance and input streams, kept open (stopped) between
+# uses so monitor/recorder starts skip PortAudio init and stream open.
+_lock = threading.Lock()
+_pa = None
+_streams = {}
+
+def get_pyaudio():
+    global _pa
+    with _lock:
+        if _pa is None:
+            _pa = pyaudio.PyAudio()
+        return _pa
+
+def acquire_input_stream(rate, channels, fmt, device_index, frames_per_buffer):
+    p = get_pyaudio()
+    key = (rate, channels, fmt, device_index, frames_per_buffer)
+    with _lock:
+        stream = _streams.get(key)
+        if stream is None:
+            stream = p.open(
+                format=fmt,
+                channels=channels,
+                rate=rate,
+                input=True,
+                input_device_index=device_index,
+                frames_per_buffer=frames_per_buffer
+            )
+            _streams[key] = stream
+    if stream.is_stopped():
+        stream.start_stream()
+    return stream
+
+def release_stream(stream):
+    """Pause a stream obtained from acquire_input_stream without closing it."""
+    if not stream.is_stopped():
+        stream.stop_stream()
+
+def close_streams():
+    with _lock:
+        streams = list(_streams.values())
+        _streams.clear()
+    for stream in streams:
+        try:
+            stream.stop_stream()
+            stream.close()
+        except Exception:
+            pass
+
+def terminate():
+    global _pa
+    close_streams()
+    with _lock:
+        if _pa is not None:
+            _pa.terminate()
+            _pa = None
\ No newline at end of file
@@ -1,41 +1,47 @@
 import sounddevice as sd
 import soundfile as sf
 import numpy as np
-import threading
 
 class AudioPlayer:
-    def __init__(self):
+    # blocksize=0 lets PortAudio pick the host's native period; preview
+    # playback does no DSP, so fewer, larger callbacks are the better trade
+    def __init__(self, blocksize=0, latency="high"):
+        self.blocksize = blocksize
+        self.latency = latency
         self.stream = None
         self.data = None
         self.samplerate = 44100
         self.position = 0
         self.is_playing = False
         self.output_device = None
-        self._lock = threading.Lock()
+        # Seeks during playback are handed to the callback through this slot
+        # so the realtime thread never takes a lock
+        self._pending_seek = None
 
     def load(self, file_path):
         self.data, self.samplerate = sf.read(file_path, dtype="float32")
         if self.data.ndim == 1:
             self.data = np.expand_dims(self.data, axis=1)
-        with self._lock:
-            self.position = 0
+        self._pending_seek = None
+        self.position = 0
 
     def _callback(self, outdata, frames, time, status):
         if status:
             print("Playback:", status)
-        with self._lock:
-            start = self.position
-            end = min(start + frames, len(self.data))
-            chunk = self.data[start:end]
-            self.position = end
+        seek = self._pending_seek
+        if seek is not None:
+            self._pending_seek = None
+            self.position = seek
+        start = self.position
+        end = min(start + frames, len(self.data))
+        self.position = end
 
-        if len(chunk) < frames:
-            pad = np.zeros((frames - len(chunk), self.data.shape[1]), dtype="float32")
-            chunk = np.vstack((chunk, pad))
-            outdata[:] = chunk
+        # Copy straight into PortAudio's buffer; no per-block allocations
+        n = end - start
+        outdata[:n] = self.data[start:end]
+        if n < frames:
+            outdata[n:].fill(0)
             raise sd.CallbackStop()
-        else:
-            outdata[:] = chunk
 
     def play(self):
         if self.data is None:
@@ -46,8 +52,8 @@ class AudioPlayer:
                 samplerate=self.samplerate,
                 channels=self.data.shape[1],
                 callback=self._callback,
-                blocksize=2048,
-                latency="high",
+                blocksize=self.blocksize,
+                latency=self.latency,
                 finished_callback=self._on_finished,
             )
             self.stream.start()
@@ -58,8 +64,7 @@ class AudioPlayer:
 
     def _on_finished(self):
         self.is_playing = False
-        with self._lock:
-            self.position = 0
+        self.position = 0
 
     def pause(self):
         if self.stream and self.stream.active:
@@ -80,13 +85,15 @@ class AudioPlayer:
     def seek(self, seconds):
         if self.data is None:
             return
-        frame = int(seconds * self.samplerate)
-        with self._lock:
-            self.position = max(0, min(frame, len(self.data)))
+        frame = max(0, min(int(seconds * self.samplerate), len(self.data)))
+        if self.is_playing:
+            self._pending_seek = frame
+        else:
+            self._pending_seek = None
+            self.position = frame
 
     def get_position(self):
-        with self._lock:
-            return self.position / self.samplerate if self.data is not None else 0.0
+        return self.position / self.samplerate if self.data is not None else 0.0
 
     def get_duration(self):
         return len(self.data) / self.samplerate if self.data is not None else 0.0
\ No newline at end of file
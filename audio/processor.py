@@ -1,14 +1,58 @@
 import os
+import contextlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import torch
 import torchaudio
 import numpy as np
+import soundfile as sf
 import tempfile
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
-
+from audio.utils import audio_info
+
+# Demucs is fed the track in windows of this many seconds, each sharing
+# STREAM_OVERLAP_SECONDS with the next, so memory is bounded by the window
+STREAM_WINDOW_SECONDS = 30
+STREAM_OVERLAP_SECONDS = 2
+
+# Where audio-separator writes its stems
+MDX_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), "omotiv_outputs")
+
+# audio-separator's MDX defaults except batch_size: the separator already
+# slices the spectrogram into segments, so run several per forward pass
+MDX_PARAMS = {
+    "hop_length": 1024,
+    "segment_size": 256,
+    "overlap": 0.25,
+    "batch_size": 4,
+    "enable_denoise": False,
+}
+
+@functools.lru_cache(maxsize=1)
 def get_downloads_folder():
     """Return the user's Downloads folder path."""
     return os.path.join(os.path.expanduser("~"), "Downloads")
 
+def _stem_target(input_path):
+    """(base name, extension, soundfile subtype) for stems derived from input_path."""
+    base, ext = os.path.splitext(os.path.basename(input_path))
+    # Fall back to WAV for containers libsndfile cannot write (e.g. m4a)
+    if not ext or not sf.check_format(ext[1:].upper()):
+        ext = ".wav"
+    # Float WAV keeps the headroom separated stems can need, as torchaudio.save did
+    subtype = "FLOAT" if ext.lower() == ".wav" else None
+    return base, ext, subtype
+
+def _autocast_context(device):
+    """Half-precision autocast for model inference: FP16 on CUDA, BF16 on CPUs that support it."""
+    device_type = torch.device(device).type
+    if device_type == "cuda":
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    bf16_supported = getattr(torch.cpu, "_is_avx512_bf16_supported", lambda: False)
+    if device_type == "cpu" and bf16_supported():
+        return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext()
+
 class MDXModelWrapper:
     """Wrapper for MDX vocal removal model with CPU-only processing."""
     def __init__(self, model_path, status_callback=None):
@@ -16,18 +60,21 @@ class MDXModelWrapper:
         self.separator = None
         self.status_callback = status_callback
 
-    def __call__(self, waveform, sample_rate=44100):
+    def __call__(self, waveform, sample_rate=44100, source_path=None, status_callback=None):
+        # The wrapper is cached across jobs, so status goes to the caller's
+        # callback for this call rather than to shared state on the wrapper
+        status_callback = status_callback or self.status_callback
         try:
             if self.separator is None:
-                if self.status_callback:
-                    self.status_callback("Loading MDX vocal removal model (CPU-only)...")
+                if status_callback:
+                    status_callback("Loading MDX vocal removal model (CPU-only)...")
                 try:
                     from audio_separator.separator import Separator
                 except ImportError as e:
                     raise ImportError("audio-separator package not found. Please install it with: pip install audio-separator") from e
 
                 # Use a user-writable temp directory for outputs
-                output_dir = os.path.join(tempfile.gettempdir(), "omotiv_outputs")
+                output_dir = MDX_OUTPUT_DIR
                 os.makedirs(output_dir, exist_ok=True)
                 # Force CPU-only processing by setting environment variables
                 os.environ['PYTORCH_ENABLE_MPS_FALLBACK'] = '1'
@@ -37,44 +84,64 @@ class MDXModelWrapper:
                 # Only use supported args for Separator
                 self.separator = Separator(
                     output_dir=output_dir,
-                    output_format="wav"
+                    output_format="wav",
+                    mdx_params=MDX_PARAMS,
                 )
                 self.separator.load_model(self.model_path)
 
-            if self.status_callback:
-                self.status_callback("Processing with MDX model (CPU-only)...")
+            if status_callback:
+                status_callback("Processing with MDX model (CPU-only)...")
 
-            # Convert waveform to proper format for saving
-            if isinstance(waveform, torch.Tensor):
-                waveform_tensor = waveform.cpu()  # Force CPU
-            else:
-                waveform_tensor = torch.from_numpy(waveform).float()
+            # The separator only reads from disk. When the caller still has the
+            # source file, hand that over instead of re-encoding the waveform;
+            # otherwise stage it in RAM-backed storage where available.
+            temp_dir = None
 
-            # Ensure proper dimensions for saving
-            if waveform_tensor.dim() == 1:
-                waveform_tensor = waveform_tensor.unsqueeze(0)
-            elif waveform_tensor.dim() == 3:
-                waveform_tensor = waveform_tensor.squeeze(0)
+            try:
+                if source_path and os.path.isfile(source_path):
+                    input_file = source_path
+                elif waveform is None:
+                    raise ValueError("MDX needs either a waveform or an existing source file")
+                else:
+                    if isinstance(waveform, torch.Tensor):
+                        waveform_tensor = waveform.cpu()  # Force CPU
+                    else:
+                        waveform_tensor = torch.from_numpy(waveform).float()
 
-            # Use a temp file for input
-            temp_dir = tempfile.mkdtemp()
-            temp_path = os.path.join(temp_dir, "input_audio.wav")
+                    # Ensure proper dimensions for saving
+                    if waveform_tensor.dim() == 1:
+                        waveform_tensor = waveform_tensor.unsqueeze(0)
+                    elif waveform_tensor.dim() == 3:
+                        waveform_tensor = waveform_tensor.squeeze(0)
 
-            try:
-                torchaudio.save(temp_path, waveform_tensor, sample_rate)
-                if self.status_callback:
-                    self.status_callback("Running MDX separation...")
+                    temp_dir = tempfile.mkdtemp(dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+                    input_file = os.path.join(temp_dir, "input_audio.wav")
+                    sf.write(input_file, waveform_tensor.T.numpy(), sample_rate, subtype="FLOAT")
 
-                output_files = self.separator.separate(temp_path)
+                if status_callback:
+                    status_callback("Running MDX separation...")
+
+                # Snapshot the output dir so the fallback below only considers
+                # stems written by this run, not leftovers from earlier jobs.
+                # Re-running the same input overwrites same-named stems, so
+                # the snapshot keeps mtimes and not just names.
+                output_dir = self.separator.output_dir
+                existing = {e.name: e.stat().st_mtime_ns for e in os.scandir(output_dir)}
+
+                # The separator's STFT runs through torch; no autograd needed
+                with torch.inference_mode():
+                    output_files = self.separator.separate(input_file)
 
                 vocals, instrumental = None, None
 
-                if self.status_callback:
-                    self.status_callback("Loading separated stems...")
+                if status_callback:
+                    status_callback("Loading separated stems...")
 
                 # Handle different return formats
                 if isinstance(output_files, list):
                     for file_path in output_files:
+                        # Some audio-separator versions return bare file names
+                        file_path = os.path.join(output_dir, file_path)
                         if os.path.exists(file_path):
                             filename = os.path.basename(file_path).lower()
                             if 'vocal' in filename or 'voice' in filename:
@@ -87,6 +154,7 @@ class MDXModelWrapper:
                                 instrumental, _ = torchaudio.load(file_path)
                 elif isinstance(output_files, dict):
                     for key, file_path in output_files.items():
+                        file_path = os.path.join(output_dir, file_path)
                         if os.path.exists(file_path):
                             if 'vocal' in key.lower():
                                 vocals, _ = torchaudio.load(file_path)
@@ -95,10 +163,10 @@ class MDXModelWrapper:
 
                 # If we still don't have both, check the output directory
                 if vocals is None or instrumental is None:
-                    output_dir = self.separator.output_dir
-                    for file in os.listdir(output_dir):
-                        if file.endswith('.wav'):
-                            file_path = os.path.join(output_dir, file)
+                    for entry in os.scandir(output_dir):
+                        file = entry.name
+                        if file.endswith('.wav') and entry.stat().st_mtime_ns > existing.get(file, -1):
+                            file_path = entry.path
                             if 'vocal' in file.lower() and vocals is None:
                                 vocals, _ = torchaudio.load(file_path)
                             elif 'instrumental' in file.lower() and instrumental is None:
@@ -110,16 +178,17 @@ class MDXModelWrapper:
                 return [vocals, instrumental]
 
             finally:
-                # Always clean up temp files
-                try:
-                    import shutil
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-                except Exception:
-                    pass
+                # Clean up the staged input, if one was written
+                if temp_dir is not None:
+                    try:
+                        import shutil
+                        shutil.rmtree(temp_dir, ignore_errors=True)
+                    except Exception:
+                        pass
 
         except Exception as e:
-            if self.status_callback:
-                self.status_callback(f"MDX processing error: {str(e)}")
+            if status_callback:
+                status_callback(f"MDX processing error: {str(e)}")
             raise
 
     def cleanup(self):
@@ -139,8 +208,14 @@ class AudioProcessor(QObject):
     def __init__(self, model_manager, parent=None):
         super().__init__(parent)
         self.model_manager = model_manager
+        # Resolve the Demucs device before any MDX run: MDXModelWrapper clears
+        # CUDA_VISIBLE_DEVICES when it builds its separator, and a first CUDA
+        # probe after that would pin every later Demucs job to the CPU
+        self.device = model_manager.device
         self.cancelled = False
         self._current_mdx_model = None
+        # One wrapper per model so the ONNX session survives between jobs
+        self._mdx_cache = {}
 
     def cancel(self):
         self.cancelled = True
@@ -150,8 +225,131 @@ class AudioProcessor(QObject):
             except Exception:
                 pass
 
+    def cleanup(self):
+        """Release every cached MDX separator."""
+        for mdx_model in self._mdx_cache.values():
+            mdx_model.cleanup()
+        self._mdx_cache.clear()
+        self._current_mdx_model = None
+
+    def _stream_demucs(self, model, input_path, sr, total_frames, keep, stem_paths, subtype,
+                       shifts, overlap, is_cancelled, emit_progress):
+        """Separate input_path window by window, writing the kept stems as it goes.
+
+        Consecutive windows overlap by STREAM_OVERLAP_SECONDS and are joined
+        with a linear crossfade, so only one window (plus its tail) of
+        sources is ever held. Returns the stem paths written, which is empty
+        when the input has no frames, or None if cancelled; partial stems are
+        removed in that case.
+        """
+        from demucs.apply import apply_model
+        device = self.device
+        window = int(STREAM_WINDOW_SECONDS * sr)
+        overlap_frames = int(STREAM_OVERLAP_SECONDS * sr)
+        keep_idx = torch.tensor(keep, dtype=torch.long)
+        fade_in = torch.linspace(0.0, 1.0, overlap_frames)
+        writers = []
+        # One writer thread per stem: libsndfile releases the GIL, so a
+        # window's stems are encoded in parallel while the next one separates
+        executor = ThreadPoolExecutor(max_workers=min(4, max(1, len(stem_paths))))
+        pending = []
+
+        def write_stems(stems):
+            # Keep each file's writes in order before queueing the next block
+            for future in pending:
+                future.result()
+            pending[:] = [
+                executor.submit(writer.write, stem.T.numpy())
+                for writer, stem in zip(writers, stems)
+            ]
+
+        tail = None
+        offset = 0
+        completed = False
+        try:
+            for chunk in self._read_windows(input_path, window, window - overlap_frames):
+                if is_cancelled():
+                    return None
+                n = chunk.shape[1]
+                if n == 0:
+                    break
+                if not writers:
+                    writers = [sf.SoundFile(path, "w", sr, chunk.shape[0], subtype) for path in stem_paths]
+
+                with torch.inference_mode(), _autocast_context(device):
+                    chunk = chunk.unsqueeze(0)
+                    if torch.device(device).type == "cuda":
+                        chunk = chunk.pin_memory().to(device, non_blocking=True)
+                    # shifts > 0 averages randomly time-shifted passes and overlap
+                    # is the fraction shared between split segments: both trade
+                    # speed for marginal quality, so the defaults favour speed
+                    sources = apply_model(model, chunk, shifts=shifts, overlap=overlap, split=True)[0]
+                    # Kept stems only, cast back to float32, in one host transfer
+                    kept = sources.index_select(0, keep_idx.to(sources.device)).float().cpu()
+
+                if tail is not None:
+                    ov = min(tail.shape[-1], n)
+                    ramp = fade_in[:ov] if ov == overlap_frames else torch.linspace(0.0, 1.0, ov)
+                    write_stems(tail[..., :ov] * (1 - ramp) + kept[..., :ov] * ramp)
+                    kept = kept[..., ov:]
+
+                if n < window:
+                    write_stems(kept)
+                    tail = None
+                    break
+                write_stems(kept[..., :-overlap_frames])
+                tail = kept[..., -overlap_frames:]
+                offset += window - overlap_frames
+                if total_frames:
+                    emit_progress(50 + int(30 * min(offset, total_frames) / total_frames))
+
+            if tail is not None:
+                write_stems(tail)
+            for future in pending:
+                future.result()
+            completed = True
+            # No writer means no window had any frames, so nothing was written
+            return list(stem_paths) if writers else []
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for writer in writers:
+                writer.close()
+            if not completed:
+                for path in stem_paths:
+                    if os.path.exists(path):
+                        os.remove(path)
+
+    @staticmethod
+    def _read_windows(input_path, window, hop):
+        """Yield channels-first float32 windows of input_path, hop frames apart.
+
+        libsndfile formats are read through one open SoundFile straight into
+        NumPy; anything else (e.g. m4a) goes through torchaudio seeks.
+        """
+        try:
+            f = sf.SoundFile(input_path)
+        except (RuntimeError, TypeError):
+            f = None
+        if f is None:
+            offset = 0
+            while True:
+                chunk, _ = torchaudio.load(input_path, frame_offset=offset, num_frames=window)
+                yield chunk
+                if chunk.shape[1] < window:
+                    return
+                offset += hop
+        with f:
+            offset = 0
+            while True:
+                f.seek(offset)
+                chunk = f.read(window, dtype="float32", always_2d=True)
+                yield torch.from_numpy(np.ascontiguousarray(chunk.T))
+                if len(chunk) < window:
+                    return
+                offset += hop
+
     @pyqtSlot(str, str, list)
-    def run(self, input_path, output_path, instruments_to_remove, progress_callback=None, status_callback=None, cancelled=None):
+    def run(self, input_path, output_path, instruments_to_remove, progress_callback=None, status_callback=None, cancelled=None, shifts=0, overlap=0.1):
         def emit_status(msg):
             if status_callback:
                 status_callback(msg)
@@ -172,8 +370,9 @@ class AudioProcessor(QObject):
 
         try:
             self.cancelled = False
-            emit_status("Loading audio file...")
-            waveform, sr = torchaudio.load(input_path)
+            emit_status("Reading audio file...")
+            # Only the header here; both separators read the samples themselves
+            sr, total_frames, _ = audio_info(input_path)
 
             instrument = instruments_to_remove[0].lower() if instruments_to_remove else "vocals"
 
@@ -184,7 +383,9 @@ class AudioProcessor(QObject):
                 try:
                     model_name = "UVR-MDX-NET-Inst_HQ_1.onnx"  # Fixed to match your working model
                     emit_status(f"Loading MDX model: {model_name}")
-                    mdx_model = MDXModelWrapper(model_name, emit_status)
+                    mdx_model = self._mdx_cache.get(model_name)
+                    if mdx_model is None:
+                        mdx_model = self._mdx_cache[model_name] = MDXModelWrapper(model_name)
                     self._current_mdx_model = mdx_model
                     emit_progress(40)
                     
@@ -192,7 +393,7 @@ class AudioProcessor(QObject):
                         mdx_model.cleanup()
                         return None
                         
-                    sources = mdx_model(waveform, sr)
+                    sources = mdx_model(None, sr, source_path=input_path, status_callback=emit_status)
                     emit_progress(70)
                     
                     if is_cancelled():
@@ -205,16 +406,11 @@ class AudioProcessor(QObject):
                     else:
                         raise ValueError("Expected 2 sources from MDX model")
                     
-                    mdx_model.cleanup()
-                    
                     emit_status("Saving instrumental stem...")
                     emit_progress(90)
                     
                     downloads_dir = get_downloads_folder()
-                    base_filename = os.path.basename(input_path)
-                    base, ext = os.path.splitext(base_filename)
-                    if not ext:
-                        ext = ".wav"
+                    base, ext, subtype = _stem_target(input_path)
                     out_path = os.path.join(downloads_dir, f"{base}_instrumental{ext}")
                     
                     if not isinstance(instrumental, torch.Tensor):
@@ -224,7 +420,7 @@ class AudioProcessor(QObject):
                     elif instrumental.dim() == 3:
                         instrumental = instrumental.squeeze(0)
                         
-                    torchaudio.save(out_path, instrumental, sr)
+                    sf.write(out_path, instrumental.float().T.numpy(), sr, subtype=subtype)
                     emit_progress(100)
                     emit_status(f"Processing complete. Saved to {out_path}")
                     self.processing_finished.emit(out_path)
@@ -236,14 +432,13 @@ class AudioProcessor(QObject):
                     # Fall through to Demucs section
 
             # --- Demucs Separation ---
-            from demucs.apply import apply_model
             model_name = "htdemucs_ft"
             emit_status(f"Loading Demucs model: {model_name}")
             emit_progress(20)
             
             try:
+                # ModelManager returns a cached, device-resident model
                 model = self.model_manager.load_model_safely(model_name, emit_status)
-                model = model.to(self.model_manager.device)
             except Exception as e:
                 emit_status(f"Demucs model loading failed: {str(e)}")
                 self.processing_finished.emit("")
@@ -257,41 +452,22 @@ class AudioProcessor(QObject):
             emit_progress(50)
 
             try:
-                with torch.inference_mode():
-                    if waveform.dim() == 2:
-                        waveform = waveform.unsqueeze(0)
-                    sources = apply_model(
-                        model,
-                        waveform,
-                        device=self.model_manager.device,
-                        shifts=1,
-                        overlap=0.25,
-                        split=True,
-                    )[0]
-
-                    if is_cancelled():
-                        emit_status("Processing cancelled mid-way.")
-                        return None
+                base, ext, subtype = _stem_target(input_path)
+                downloads_dir = get_downloads_folder()
 
-                emit_status("Saving stems...")
-                emit_progress(80)
+                # Skip the requested instrument
+                keep = [i for i, name in enumerate(model.sources) if name.lower() != instrument]
+                stem_paths = [
+                    os.path.join(downloads_dir, f"{base}_{model.sources[i]}{ext}") for i in keep
+                ]
 
-                base_filename = os.path.basename(input_path)
-                base, ext = os.path.splitext(base_filename)
-                if not ext:
-                    ext = ".wav"
-                downloads_dir = get_downloads_folder()
-                saved_paths = []
-                
-                for i, name in enumerate(model.sources):
-                    if is_cancelled():
-                        emit_status("Saving cancelled.")
-                        return None
-                    if name.lower() == instrument:
-                        continue  # Skip the requested instrument
-                    stem_path = os.path.join(downloads_dir, f"{base}_{name}{ext}")
-                    torchaudio.save(stem_path, sources[i].cpu(), sr)
-                    saved_paths.append(stem_path)
+                saved_paths = self._stream_demucs(
+                    model, input_path, sr, total_frames, keep, stem_paths, subtype,
+                    shifts, overlap, is_cancelled, emit_progress,
+                )
+                if saved_paths is None:
+                    emit_status("Processing cancelled mid-way.")
+                    return None
 
                 emit_progress(100)
                 if saved_paths:
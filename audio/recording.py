@@ -2,14 +2,63 @@ import os
 import time
 import tempfile
 import numpy as np
-import torch
-import torchaudio
 import pyaudio
+import soundfile as sf
 
 from PyQt6.QtCore import QThread, pyqtSignal
+from audio import pa_pool
+
+LEVEL_EMIT_INTERVAL = 0.05  # seconds between level updates sent to the GUI
+
+class _LevelAccumulator:
+    """Per-channel RMS over all chunks captured since the last emitted update."""
+    def __init__(self, channels):
+        self.channels = channels
+        self._sumsq = np.zeros(channels, dtype=np.int64)
+        self._count = 0
+        self._last_emit = time.monotonic()
+
+    def add(self, data):
+        """Accumulate a chunk; return normalized levels once per LEVEL_EMIT_INTERVAL, else None."""
+        samples = np.frombuffer(data, dtype=np.int16).reshape(-1, self.channels)
+        # Integer sum of squares: no float32 copy of the chunk
+        self._sumsq += np.einsum('ij,ij->j', samples, samples, dtype=np.int64)
+        self._count += len(samples)
+        now = time.monotonic()
+        if now - self._last_emit < LEVEL_EMIT_INTERVAL or not self._count:
+            return None
+        levels = (np.sqrt(self._sumsq / self._count) / 32768.0).tolist()
+        self._sumsq[:] = 0
+        self._count = 0
+        self._last_emit = now
+        return levels
+
+class _DeviceCache:
+    """Remembers the chosen capture device so each start skips the full device scan."""
+    _input_device_index = None
+
+    @classmethod
+    def get_input_device_index(cls, p):
+        if cls._input_device_index is None:
+            input_device_index = None
+            for i in range(p.get_device_count()):
+                info = p.get_device_info_by_index(i)
+                name = info['name'].lower()
+                if any(k in name for k in ['stereo mix', 'loopback', 'blackhole']):
+                    if info['maxInputChannels'] >= 2:
+                        input_device_index = i
+                        break
+            if input_device_index is None:
+                input_device_index = p.get_default_input_device_info()['index']
+            cls._input_device_index = input_device_index
+        return cls._input_device_index
+
+    @classmethod
+    def invalidate(cls):
+        cls._input_device_index = None
 
 class LiveLevelMonitor(QThread):
-    audio_level_updated = pyqtSignal(bytes)
+    audio_level_updated = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
 
     def __init__(self):
@@ -29,60 +78,52 @@ class LiveLevelMonitor(QThread):
 
     def run(self):
         try:
-            p = pyaudio.PyAudio()
-            input_device_index = None
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                name = info['name'].lower()
-                if any(k in name for k in ['stereo mix', 'loopback', 'blackhole']):
-                    if info['maxInputChannels'] >= 2:
-                        input_device_index = i
-                        break
-            if input_device_index is None:
-                input_device_index = p.get_default_input_device_info()['index']
+            p = pa_pool.get_pyaudio()
+            input_device_index = _DeviceCache.get_input_device_index(p)
 
-            stream = p.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=input_device_index,
-                frames_per_buffer=self.chunk_size
+            stream = pa_pool.acquire_input_stream(
+                self.sample_rate, self.channels, self.format,
+                input_device_index, self.chunk_size
             )
 
+            levels = _LevelAccumulator(self.channels)
             while self.is_monitoring:
                 data = stream.read(self.chunk_size, exception_on_overflow=False)
-                self.audio_level_updated.emit(data)
+                level = levels.add(data)
+                if level is not None:
+                    self.audio_level_updated.emit(level)
 
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
+            pa_pool.release_stream(stream)
         except Exception as e:
+            # The device may have been unplugged or renumbered; rescan next time
+            _DeviceCache.invalidate()
+            pa_pool.close_streams()
             self.error_occurred.emit(f"Failed to start monitoring: {e}")
 
 class LiveRecorder(QThread):
     recording_started = pyqtSignal()
     recording_stopped = pyqtSignal(str)
     recording_time_updated = pyqtSignal(str)
-    audio_level_updated = pyqtSignal(bytes)
+    audio_level_updated = pyqtSignal(list)
     error_occurred = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
         self.is_recording = False
-        self.audio_data = []
         self.temp_file_path = None
         self.start_time = 0
         self.sample_rate = 44100
         self.channels = 2
         self.chunk_size = 1024
         self.format = pyaudio.paInt16
+        self._sf = None
+        self._frames_written = 0
 
     def start_recording(self):
         if self.is_recording:
             return
         self.is_recording = True
-        self.audio_data = []
+        self._frames_written = 0
         self.start_time = time.time()
         temp_dir = tempfile.gettempdir()
         self.temp_file_path = os.path.join(temp_dir, f"omotiv_recording_{int(time.time())}.wav")
@@ -93,56 +134,57 @@ class LiveRecorder(QThread):
 
     def run(self):
         try:
-            p = pyaudio.PyAudio()
-            input_device_index = None
-            for i in range(p.get_device_count()):
-                info = p.get_device_info_by_index(i)
-                name = info['name'].lower()
-                if any(k in name for k in ['stereo mix', 'loopback', 'blackhole']):
-                    if info['maxInputChannels'] >= 2:
-                        input_device_index = i
-                        break
-            if input_device_index is None:
-                input_device_index = p.get_default_input_device_info()['index']
+            p = pa_pool.get_pyaudio()
+            input_device_index = _DeviceCache.get_input_device_index(p)
 
-            stream = p.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                input_device_index=input_device_index,
-                frames_per_buffer=self.chunk_size
+            stream = pa_pool.acquire_input_stream(
+                self.sample_rate, self.channels, self.format,
+                input_device_index, self.chunk_size
+            )
+
+            # Stream PCM straight to disk so memory stays O(chunk) for any take length
+            self._sf = sf.SoundFile(
+                self.temp_file_path, mode='w', samplerate=self.sample_rate,
+                channels=self.channels, subtype='PCM_16'
             )
 
             self.recording_started.emit()
 
+            levels = _LevelAccumulator(self.channels)
             while self.is_recording:
                 data = stream.read(self.chunk_size, exception_on_overflow=False)
-                self.audio_data.append(data)
-                self.audio_level_updated.emit(data)
+                self._sf.buffer_write(data, dtype='int16')
+                self._frames_written += len(data) // (2 * self.channels)
+                level = levels.add(data)
+                if level is not None:
+                    self.audio_level_updated.emit(level)
 
                 elapsed = time.time() - self.start_time
                 minutes, seconds = divmod(int(elapsed), 60)
                 self.recording_time_updated.emit(f"{minutes:02d}:{seconds:02d}")
 
-            stream.stop_stream()
-            stream.close()
-            p.terminate()
-
-            if self.audio_data and self.temp_file_path:
-                self.save_recording()
+            pa_pool.release_stream(stream)
+            self.save_recording()
         except Exception as e:
+            _DeviceCache.invalidate()
+            pa_pool.close_streams()
+            self._close_file()
             self.error_occurred.emit(f"Recording failed: {e}")
 
+    def _close_file(self):
+        if self._sf is not None:
+            try:
+                self._sf.close()
+            except Exception:
+                pass
+            self._sf = None
+
     def save_recording(self):
         try:
-            audio_bytes = b''.join(self.audio_data)
-            audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-            if self.channels == 2:
-                audio_np = audio_np.reshape(-1, 2)
-            audio_float = audio_np.astype(np.float32) / 32768.0
-            audio_tensor = torch.from_numpy(audio_float.T if self.channels == 2 else audio_float).float()
-            torchaudio.save(self.temp_file_path, audio_tensor, self.sample_rate)
-            self.recording_stopped.emit(self.temp_file_path)
+            self._close_file()
+            if self._frames_written:
+                self.recording_stopped.emit(self.temp_file_path)
+            elif self.temp_file_path and os.path.exists(self.temp_file_path):
+                os.remove(self.temp_file_path)
         except Exception as e:
             self.error_occurred.emit(f"Failed to save: {e}")
\ No newline at end of file
@@ -1,14 +1,42 @@
 import os
-import numpy as np
-import torch
-
-def mix_tracks(track1, track2, output_file, sample_rate=44100):
-    max_len = max(track1.shape[1], track2.shape[1])
-    if track1.shape[1] < max_len:
-        track1 = torch.nn.functional.pad(track1, (0, max_len - track1.shape[1]))
-    if track2.shape[1] < max_len:
-        track2 = torch.nn.functional.pad(track2, (0, max_len - track2.shape[1]))
-    mixed = track1 + track2
+from functools import lru_cache
+
+
+@lru_cache(maxsize=32)
+def _audio_info(path, mtime_ns, size):
     import torchaudio
-    torchaudio.save(output_file, mixed, sample_rate)
-    return output_file
\ No newline at end of file
+    meta = torchaudio.info(path)
+    return meta.sample_rate, meta.num_frames, meta.num_channels
+
+
+def audio_info(path):
+    """(sample_rate, num_frames, num_channels) for path, cached per file version."""
+    st = os.stat(path)
+    return _audio_info(path, st.st_mtime_ns, st.st_size)
+
+
+# Frames mixed and written per step by mix_tracks
+MIX_CHUNK_FRAMES = 1 << 16
+
+
+def mix_tracks(track1, track2, output_file, sample_rate=44100, chunk_frames=MIX_CHUNK_FRAMES):
+    # Stream the sum to disk a window at a time: only the overlapping part of
+    # each window is copied, so nothing the size of the mix is allocated.
+    import numpy as np
+    import soundfile as sf
+    if track1.shape[1] >= track2.shape[1]:
+        longer, shorter = track1, track2
+    else:
+        longer, shorter = track2, track1
+    overlap = shorter.shape[1]
+    ext = os.path.splitext(output_file)[1][1:].upper()
+    subtype = "FLOAT" if ext and sf.check_format(ext, "FLOAT") else None
+    with sf.SoundFile(output_file, "w", sample_rate, longer.shape[0], subtype=subtype) as out:
+        for start in range(0, longer.shape[1], chunk_frames):
+            block = longer[:, start:start + chunk_frames]
+            if start < overlap:
+                block = block.clone()
+                end = min(start + block.shape[1], overlap)
+                block[:, :end - start] += shorter[:, start:end]
+            out.write(np.ascontiguousarray(block.T.cpu().numpy()))
+    return output_file
@@ -3,46 +3,49 @@
 
 import os
 import ssl
-import torch
-import torchaudio
 from pathlib import Path
 import warnings
 import tempfile  # <-- Add this line near the top of main.py
 
 
-from PyQt6.QtCore import Qt, QTimer, QThread
+from PyQt6.QtCore import Qt, QTimer, QThreadPool, QRunnable
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout,
     QWidget, QPushButton, QLabel, QFileDialog, QProgressBar,
-    QTextEdit, QGroupBox, QMessageBox, QRadioButton, QButtonGroup
+    QPlainTextEdit, QGroupBox, QMessageBox, QRadioButton, QButtonGroup
 )
 from PyQt6.QtGui import QFont
 
 # Local imports
 from audio.utils import *
 from audio.recording import LiveRecorder, LiveLevelMonitor
-from audio.processor import AudioProcessor
 from audio.player import AudioPlayer
+from audio import pa_pool
 from ui.level_meter import LevelMeter
 from ui.waveform_widget import AudioEditorSection
 from ui.recording_booth import RecordingBooth
 from audio.model_manager import ModelManager
 
-model_manager = ModelManager()
-processor = AudioProcessor(model_manager)
-
 ssl._create_default_https_context = ssl._create_unverified_context
 warnings.filterwarnings("ignore", category=UserWarning, module="torchaudio")
 
 from PyQt6.QtCore import QObject, pyqtSignal
 
-class AudioWorker(QObject):
+def _file_version(path):
+    try:
+        return (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return (path, None)
+
+class WorkerSignals(QObject):
     progress_updated = pyqtSignal(int)
     status_updated = pyqtSignal(str)
     processing_finished = pyqtSignal(str)
-    
+
+class AudioWorker(QRunnable):
     def __init__(self, processor, input_file, output_dir, instruments_to_remove):
         super().__init__()
+        self.signals = WorkerSignals()
         self.processor = processor
         self.input_file = input_file
         self.output_dir = output_dir
@@ -56,14 +59,15 @@ class AudioWorker(QObject):
                 self.input_file,
                 self.output_dir,
                 self.instruments_to_remove,
-                progress_callback=self.progress_updated.emit,
-                status_callback=self.status_updated.emit,
+                progress_callback=self.signals.progress_updated.emit,
+                status_callback=self.signals.status_updated.emit,
                 cancelled=lambda: self._cancelled
             )
-            self.processing_finished.emit(output_file)
+            # A cancelled run returns None; finish with "" so the UI resets
+            self.signals.processing_finished.emit(output_file or "")
         except Exception as e:
-            self.status_updated.emit(f"Error: {str(e)}")
-            self.processing_finished.emit("")
+            self.signals.status_updated.emit(f"Error: {str(e)}")
+            self.signals.processing_finished.emit("")
     
     def cancel(self):
         self._cancelled = True
@@ -71,10 +75,14 @@ class AudioWorker(QObject):
 class OmotivApp(QMainWindow):
     def __init__(self):
         super().__init__()
-        self.input_file = None
+        self.input_file = None  # pathlib.Path of the current track
         self.output_dir = tempfile.gettempdir()
         self.worker = None
-        self.thread = None
+        self.processor = None
+        # Separation jobs get their own single-thread pool: one job at a time,
+        # and closeEvent's waitForDone() doesn't wait on unrelated pool work
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
         self.recording_thread = None
         self.level_monitor = None
         self.is_recording = False
@@ -83,13 +91,16 @@ class OmotivApp(QMainWindow):
 
         # Editor-specific playback
         self.audio_player = AudioPlayer()
+        self._player_loaded_path = None
+        self._editor_loaded_path = None
         self.editor_is_playing = False
+        # Single-shot, re-armed per tick at the rate the cursor moves a pixel
         self.playback_timer = QTimer(self)
+        self.playback_timer.setSingleShot(True)
         self.playback_timer.timeout.connect(self.update_editor_cursor)
         self.playback_position_sec = 0.0
 
         os.makedirs(self.output_dir, exist_ok=True)
-        from audio.model_manager import ModelManager
         self.model_manager = ModelManager()
 
         self.init_ui()
@@ -188,6 +199,7 @@ class OmotivApp(QMainWindow):
             self.instrument_group_buttons.addButton(radio)
             instrument_layout.addWidget(radio)
         self.instrument_radios["vocals"].setChecked(True)
+        self._radio_to_key = {radio: key for key, radio in self.instrument_radios.items()}
         layout.addWidget(instrument_group)
 
 
@@ -209,8 +221,9 @@ class OmotivApp(QMainWindow):
         layout.addWidget(self.cancel_btn)
 
         # Status text
-        self.status_text = QTextEdit()
+        self.status_text = QPlainTextEdit()
         self.status_text.setReadOnly(True)
+        self.status_text.setMaximumBlockCount(200)
         self.status_text.setMaximumHeight(140)
         layout.addWidget(self.status_text)
 
@@ -219,32 +232,30 @@ class OmotivApp(QMainWindow):
 
     # ===== Processing =====
     def process_audio(self):
-        if not self.input_file:
+        # One job at a time: the processor and its cached models are shared
+        if not self.input_file or self.worker is not None:
             return
 
-        instruments_to_remove = [
-            key for key, radio in self.instrument_radios.items() if radio.isChecked()
-        ]
+        btn = self.instrument_group_buttons.checkedButton()
+        instruments_to_remove = [self._radio_to_key[btn]] if btn else []
         if not instruments_to_remove:
             QMessageBox.warning(self, "Error", "Select an instrument to mute")
             return
 
         self.file_group.setVisible(False)
 
-        processor = AudioProcessor(self.model_manager)
-        self.worker = AudioWorker(processor, self.input_file, self.output_dir, instruments_to_remove)
-        self.thread = QThread(self)
-        self.worker.moveToThread(self.thread)
-
-        self.thread.started.connect(self.worker.run)
-        self.worker.progress_updated.connect(self.update_progress)
-        self.worker.status_updated.connect(self.add_status)
-        self.worker.processing_finished.connect(self.processing_finished)
-        self.worker.processing_finished.connect(self.thread.quit)
-        self.thread.finished.connect(self.thread.deleteLater)
+        # Deferred so torch/torchaudio/demucs stay off the startup path
+        if self.processor is None:
+            from audio.processor import AudioProcessor
+            self.processor = AudioProcessor(self.model_manager)
+        self.worker = AudioWorker(self.processor, str(self.input_file), self.output_dir, instruments_to_remove)
+        self.worker.signals.progress_updated.connect(self.update_progress)
+        self.worker.signals.status_updated.connect(self.add_status)
+        self.worker.signals.processing_finished.connect(self.processing_finished)
 
-        self.thread.start()
-        self.add_status(f"Processing {os.path.basename(self.input_file)}...")
+        self.process_btn.setEnabled(False)
+        self.pool.start(self.worker)
+        self.add_status(f"Processing {self.input_file.name}...")
 
     def update_progress(self, value):
         self.progress_bar.setVisible(True)
@@ -252,15 +263,25 @@ class OmotivApp(QMainWindow):
         self.progress_bar.setValue(value)
 
     def processing_finished(self, output_file):
+        self.worker = None
+        self.cancel_btn.setVisible(False)
+        if not output_file:
+            # Cancelled or failed: keep the current track so it can be
+            # processed again, and let a different file be picked
+            self.progress_bar.setVisible(False)
+            self.file_group.setVisible(True)
+            self.process_btn.setEnabled(self.input_file is not None)
+            return
         self.add_status(f"Saved: {output_file}")
         QMessageBox.information(self, "Done", f"Saved file:\n{output_file}")
         self.export_btn.setEnabled(True)
         self.open_booth_btn.setEnabled(True)
-        self.audio_editor.load_audio(output_file)
-        self.input_file = output_file
+        self.load_editor_audio(output_file)
+        self.input_file = Path(output_file)
+        self.process_btn.setEnabled(True)
 
     def add_status(self, msg: str):
-        self.status_text.append(msg)
+        self.status_text.appendPlainText(msg)
         try:
             self.statusBar().showMessage(msg)
         except Exception:
@@ -279,7 +300,7 @@ class OmotivApp(QMainWindow):
             QMessageBox.warning(self, "No Recording", "No file to export.")
             return
 
-        default_name = os.path.basename(self.input_file)
+        default_name = self.input_file.name
         export_path, _ = QFileDialog.getSaveFileName(
             self,
             "Save Recording As",
@@ -290,11 +311,13 @@ class OmotivApp(QMainWindow):
             return
 
         try:
-            waveform, sr = torchaudio.load(self.input_file)
+            import torchaudio
+            # Cached header read for the rate, then decode just the trimmed region
+            sr, _, _ = audio_info(str(self.input_file))
             trim_start, trim_end = self.audio_editor.get_trim_range()
             start_idx = int(trim_start * sr)
-            end_idx = int(trim_end * sr) if trim_end else waveform.shape[1]
-            trimmed = waveform[:, start_idx:end_idx]
+            num_frames = int(trim_end * sr) - start_idx if trim_end else -1
+            trimmed, sr = torchaudio.load(str(self.input_file), frame_offset=start_idx, num_frames=num_frames)
             torchaudio.save(export_path, trimmed, sr)
             QMessageBox.information(self, "Export Complete", f"Saved:\n{export_path}")
         except Exception as e:
@@ -305,14 +328,7 @@ class OmotivApp(QMainWindow):
         try:
             if self.worker:
                 self.worker.cancel()
-            if self.thread:
-                try:
-                    if self.thread.isRunning():
-                        self.thread.quit()
-                        self.thread.wait()
-                except RuntimeError:
-                    pass
-                self.thread = None
+                self.pool.waitForDone()
                 self.worker = None
 
             if self.recording_thread:
@@ -333,6 +349,11 @@ class OmotivApp(QMainWindow):
                     pass
                 self.level_monitor = None
 
+            if self.processor:
+                self.processor.cleanup()
+            pa_pool.terminate()
+            self.model_manager.clear_cache()
+
         except Exception as e:
             print(f"Error on close: {e}")
 
@@ -384,17 +405,24 @@ class OmotivApp(QMainWindow):
         self.recording_status.setText("Recording complete")
 
         self.recorded_file_path = temp_file_path
-        self.input_file = temp_file_path
+        self.input_file = Path(temp_file_path)
 
-        self.file_label.setText(os.path.basename(temp_file_path))
-        self.process_btn.setEnabled(True)
+        self.file_label.setText(self.input_file.name)
+        self.process_btn.setEnabled(self.worker is None)
         self.open_booth_btn.setEnabled(True)
         self.export_btn.setEnabled(True)
 
-        self.audio_editor.load_audio(temp_file_path)
+        self.load_editor_audio(temp_file_path)
         self.start_level_monitoring()
 
     # ===== Audio Editor =====
+    def load_editor_audio(self, path):
+        # Output paths are reused across runs, so key on mtime as well as path
+        key = _file_version(path)
+        if key != self._editor_loaded_path:
+            self.audio_editor.load_audio(path)
+            self._editor_loaded_path = key
+
     def editor_play_pause_audio(self):
         if not self.input_file:
             return
@@ -404,20 +432,23 @@ class OmotivApp(QMainWindow):
             self.audio_editor.set_play_button_state(False)
             self.playback_timer.stop()
         else:
-            if self.audio_player.data is None:
-                self.audio_player.load(self.input_file)
+            key = _file_version(str(self.input_file))
+            if self._player_loaded_path != key:
+                self.audio_player.load(str(self.input_file))
+                self._player_loaded_path = key
             self.audio_player.play()
             self.editor_is_playing = True
             self.audio_editor.set_play_button_state(True)
-            self.playback_timer.start(30)
+            self.playback_timer.start(self.audio_editor.cursor_interval_ms())
 
     def update_editor_cursor(self):
         pos = self.audio_player.get_position()
         self.audio_editor.update_playback_position(pos)
         if not self.audio_player.is_playing:
-            self.playback_timer.stop()
             self.audio_editor.set_play_button_state(False)
             self.editor_is_playing = False
+        elif self.editor_is_playing:
+            self.playback_timer.start(self.audio_editor.cursor_interval_ms())
 
     def editor_stop_audio(self):
         self.audio_player.stop()
@@ -437,7 +468,7 @@ class OmotivApp(QMainWindow):
             return
 
         trim_start, trim_end = self.audio_editor.get_trim_range()
-        booth = RecordingBooth(self.input_file, self.output_dir, trim_start, trim_end)
+        booth = RecordingBooth(str(self.input_file), self.output_dir, trim_start, trim_end)
         booth.exec()
         self.statusBar().showMessage("Recording Booth closed")
 
@@ -447,12 +478,12 @@ class OmotivApp(QMainWindow):
             self, "Select Audio File", "",
             "Audio Files (*.wav *.mp3 *.flac *.m4a *.ogg)"
         )
-        if file_path and os.path.isfile(file_path):
-            self.input_file = file_path
-            self.file_label.setText(os.path.basename(file_path))
-            self.process_btn.setEnabled(True)
+        if file_path and Path(file_path).is_file():
+            self.input_file = Path(file_path)
+            self.file_label.setText(self.input_file.name)
+            self.process_btn.setEnabled(self.worker is None)
             self.open_booth_btn.setEnabled(True)
-            self.audio_editor.load_audio(file_path)
+            self.load_editor_audio(file_path)
         elif file_path:
             QMessageBox.critical(self, "Unsupported Format", "Please select a supported audio file.")
 
@@ -1,52 +1,81 @@
 from PyQt6.QtWidgets import QWidget
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QPainter, QColor, QFont, QLinearGradient, QBrush
+from PyQt6.QtCore import Qt, QTimer, QElapsedTimer
+from PyQt6.QtGui import QPainter, QColor, QFont, QLinearGradient, QBrush, QGradient
 import math
-import time
+import numpy as np
 
 class LevelMeter(QWidget):
     def __init__(self, channels=2, parent=None):
         super().__init__(parent)
         self.channels = channels
-        self.displayed_levels = [0.0 for _ in range(channels)]
-        self.target_levels = [0.0 for _ in range(channels)]
-        self.peak_levels = [0.0 for _ in range(channels)]
-        self.peak_times = [0.0 for _ in range(channels)]
+        self.displayed_levels = np.zeros(channels, dtype=np.float32)
+        self.target_levels = np.zeros(channels, dtype=np.float32)
+        self.peak_levels = np.zeros(channels, dtype=np.float32)
+        self.peak_times = np.zeros(channels, dtype=np.int64)
+        # Monotonic ms clock for peak hold, read once per tick
+        self._elapsed = QElapsedTimer()
+        self._elapsed.start()
         self.setMinimumHeight(50)
         self.setMinimumWidth(180)
         self.attack = 0.2
         self.release = 0.92
         self.peak_hold_ms = 700
         self.peak_threshold = 0.97
+        # Paint resources are built once; the gradients are in object-bounding
+        # coordinates so they stretch over whatever bar rect they fill
+        self._brush_peak = self._tier_brush(QColor(255, 0, 0), QColor(255, 180, 100))
+        self._brush_warn = self._tier_brush(QColor(255, 220, 0), QColor(220, 220, 50))
+        self._brush_ok = self._tier_brush(QColor(60, 220, 100), QColor(180, 255, 180))
+        self._peak_line_color = QColor(255, 140, 0)
+        self._ref_line_color = QColor(180, 180, 180)
+        self._font = QFont("Arial", 9)
+        self._prev_displayed = self.displayed_levels.copy()
+        self._prev_peaks = self.peak_levels.copy()
 
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.animate)
         self.timer.start(30)
 
+    @staticmethod
+    def _tier_brush(start, end):
+        gradient = QLinearGradient(0, 0, 1, 1)
+        gradient.setCoordinateMode(QGradient.CoordinateMode.ObjectBoundingMode)
+        gradient.setColorAt(0.0, start)
+        gradient.setColorAt(1.0, end)
+        return QBrush(gradient)
+
     def update_levels(self, levels):
-        now = time.time() * 1000
-        for i in range(self.channels):
-            lvl = min(max(levels[i], 0.0), 1.0)
-            self.target_levels[i] = lvl
-            if lvl > self.peak_levels[i]:
-                self.peak_levels[i] = lvl
-                self.peak_times[i] = now
+        now = self._elapsed.elapsed()
+        lvl = np.clip(np.asarray(levels[:self.channels], dtype=np.float32), 0.0, 1.0)
+        self.target_levels[:] = lvl
+        mask = lvl > self.peak_levels
+        self.peak_levels[mask] = lvl[mask]
+        self.peak_times[mask] = now
+        if not self.timer.isActive():
+            self.timer.start(30)
         self.update()
 
     def animate(self):
-        now = time.time() * 1000
-        for i in range(self.channels):
-            if self.target_levels[i] > self.displayed_levels[i]:
-                smoothing = self.attack
-            else:
-                smoothing = self.release
-            self.displayed_levels[i] = (
-                self.displayed_levels[i] * smoothing +
-                self.target_levels[i] * (1 - smoothing)
-            )
-            if now - self.peak_times[i] > self.peak_hold_ms:
-                self.peak_levels[i] *= 0.96
-        self.update()
+        now = self._elapsed.elapsed()
+        smoothing = np.where(self.target_levels > self.displayed_levels, self.attack, self.release)
+        self.displayed_levels[:] = (
+            self.displayed_levels * smoothing +
+            self.target_levels * (1 - smoothing)
+        )
+        self.peak_levels[now - self.peak_times > self.peak_hold_ms] *= 0.96
+
+        # Repaint only on visible change; park the timer once fully decayed
+        delta = max(
+            np.max(np.abs(self.displayed_levels - self._prev_displayed)),
+            np.max(np.abs(self.peak_levels - self._prev_peaks)),
+        )
+        if delta > 1e-4:
+            self._prev_displayed[:] = self.displayed_levels
+            self._prev_peaks[:] = self.peak_levels
+            self.update()
+        elif (np.all(self.target_levels < 1e-5) and np.all(self.displayed_levels < 1e-4)
+              and np.all(self.peak_levels < 1e-4)):
+            self.timer.stop()
 
     def paintEvent(self, event):
         painter = QPainter(self)
@@ -55,37 +84,32 @@ class LevelMeter(QWidget):
         gap = 8
         bar_height = (H - (self.channels + 1) * gap) // self.channels
         bar_width_max = W - 60
+        painter.setFont(self._font)
 
         for i in range(self.channels):
-            lvl = self.displayed_levels[i]
-            peak = self.peak_levels[i]
+            lvl = float(self.displayed_levels[i])
+            peak = float(self.peak_levels[i])
             bar_width = int(bar_width_max * lvl)
             peak_x = int(bar_width_max * peak)
             y = gap + i * (bar_height + gap)
             x = 40
 
-            gradient = QLinearGradient(x, y, x + bar_width, y + bar_height)
             if lvl >= self.peak_threshold:
-                gradient.setColorAt(0.0, QColor(255, 0, 0))
-                gradient.setColorAt(1.0, QColor(255, 180, 100))
+                painter.setBrush(self._brush_peak)
             elif lvl > 0.7:
-                gradient.setColorAt(0.0, QColor(255, 220, 0))
-                gradient.setColorAt(1.0, QColor(220, 220, 50))
+                painter.setBrush(self._brush_warn)
             else:
-                gradient.setColorAt(0.0, QColor(60, 220, 100))
-                gradient.setColorAt(1.0, QColor(180, 255, 180))
-            painter.setBrush(QBrush(gradient))
+                painter.setBrush(self._brush_ok)
             painter.setPen(Qt.PenStyle.NoPen)
             painter.drawRect(x, y, bar_width, bar_height)
 
-            painter.setPen(QColor(255, 140, 0))
+            painter.setPen(self._peak_line_color)
             painter.drawLine(x + peak_x, y, x + peak_x, y + bar_height)
 
             db_val = 20 * (math.log10(lvl) if lvl > 0.0001 else -2)
-            painter.setFont(QFont("Arial", 9))
             painter.setPen(Qt.GlobalColor.black)
             painter.drawText(0, y, 36, bar_height, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, f"{db_val:.1f} dB")
 
         peak_x = int(bar_width_max * 0.707)
-        painter.setPen(QColor(180, 180, 180))
+        painter.setPen(self._ref_line_color)
         painter.drawLine(40 + peak_x, 0, 40 + peak_x, H)
\ No newline at end of file
@@ -2,7 +2,7 @@ from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QGroupBox, QSlider, QLabel,
     QComboBox, QPushButton, QFileDialog, QMessageBox, QLineEdit, QApplication
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal
 from ui.level_meter import LevelMeter
 import sounddevice as sd
 import soundfile as sf
@@ -12,21 +12,51 @@ import threading
 from datetime import datetime
 import sys
 
+def _rms(block):
+    """RMS of a float32 block in one fused multiply-accumulate, without temporaries."""
+    return float(np.sqrt(np.vdot(block, block) / block.size)) if block.size else 0.0
+
+# Input streams let PortAudio pick the block size around this latency (s)
+INPUT_LATENCY = 0.02
+
+# The idle input meter is only drawn every METER_INTERVAL_MS, so its stream
+# delivers one block per tick instead of running at recording latency
+METER_INTERVAL_MS = 50
+METER_BLOCK_FRAMES = 44100 * METER_INTERVAL_MS // 1000
+
+# Frames mixed per block when exporting, so memory stays independent of length
+EXPORT_BLOCK_FRAMES = 65536
+
 class AudioPlayer:
     def __init__(self):
+        # Kept open across play/pause; reopened only when the format changes
         self.stream = None
+        self._stream_sig = None
         self.data = None
+        self._n_frames = 0
         self.samplerate = 44100
         self.position = 0
         self.is_playing = False
-        self._lock = threading.Lock()
-        self._last_chunk = None
+        # Seeks during playback are handed to the callback through this slot
+        # so the realtime thread never takes a lock
+        self._pending_seek = None
+        # Block RMS published by the callback for the output meter
+        self._output_level = np.zeros(1, dtype=np.float32)
         self.volume = 1.0
 
     def load(self, file_path):
         self.data, self.samplerate = sf.read(file_path, dtype="float32", always_2d=True)
-        with self._lock:
-            self.position = 0
+        self._n_frames = len(self.data)
+        self._pending_seek = None
+        self.position = 0
+
+    def set_data(self, data, samplerate):
+        """Play from an already-decoded (frames, channels) array; no copy is made."""
+        self.data = data
+        self._n_frames = len(data)
+        self.samplerate = samplerate
+        self._pending_seek = None
+        self.position = 0
 
     def trim(self, start_sec=None, end_sec=None):
         if self.data is not None:
@@ -35,41 +65,51 @@ class AudioPlayer:
             start_frame = int(start_sec * sr) if start_sec else 0
             end_frame = int(end_sec * sr) if end_sec else total
             self.data = self.data[start_frame:end_frame]
-            with self._lock:
-                self.position = 0
+            self._n_frames = len(self.data)
+            self._pending_seek = None
+            self.position = 0
 
     def _callback(self, outdata, frames, time, status):
         if status:
             print("Playback:", status)
-        with self._lock:
-            start = self.position
-            end = min(start + frames, len(self.data))
-            chunk = self.data[start:end]
-            self.position = end
-        chunk = chunk * self.volume
-        self._last_chunk = chunk.copy() if len(chunk) > 0 else None
-
-        if len(chunk) < frames:
-            pad = np.zeros((frames - len(chunk), self.data.shape[1]), dtype="float32")
-            chunk = np.vstack((chunk, pad))
-            outdata[:] = chunk
+        seek = self._pending_seek
+        if seek is not None:
+            self._pending_seek = None
+            self.position = seek
+        start = self.position
+        end = min(start + frames, self._n_frames)
+        chunk = self.data[start:end]
+        self.position = end
+        # Scale straight into PortAudio's buffer and zero the tail in place
+        n = len(chunk)
+        out = outdata[:n]
+        np.multiply(chunk, self.volume, out=out)
+        self._output_level[0] = min(_rms(out) * 5, 1.0)
+
+        if n < frames:
+            outdata[n:] = 0.0
             raise sd.CallbackStop()
-        else:
-            outdata[:] = chunk
 
     def play(self):
         if self.data is None:
             return
-        self.stop()
+        sig = (self.samplerate, self.data.shape[1])
         try:
-            self.stream = sd.OutputStream(
-                samplerate=self.samplerate,
-                channels=self.data.shape[1],
-                callback=self._callback,
-                blocksize=2048,
-                latency="high",
-                finished_callback=self._on_finished,
-            )
+            if self.stream is None or self._stream_sig != sig:
+                self.close()
+                self.stream = sd.OutputStream(
+                    samplerate=self.samplerate,
+                    channels=self.data.shape[1],
+                    callback=self._callback,
+                    blocksize=0,
+                    latency="low",
+                    finished_callback=self._on_finished,
+                )
+                self._stream_sig = sig
+            else:
+                # A stream that ended via CallbackStop must be stopped before
+                # it can be started again
+                self.stream.stop()
             self.stream.start()
             self.is_playing = True
         except Exception as e:
@@ -78,8 +118,7 @@ class AudioPlayer:
 
     def _on_finished(self):
         self.is_playing = False
-        with self._lock:
-            self.position = 0
+        self.position = 0
 
     def pause(self):
         if self.stream and self.stream.active:
@@ -91,32 +130,163 @@ class AudioPlayer:
             try:
                 if self.stream.active:
                     self.stream.stop()
+            except Exception:
+                pass
+        self.is_playing = False
+
+    def close(self):
+        """Stop playback and release the PortAudio stream."""
+        self.stop()
+        if self.stream:
+            try:
                 self.stream.close()
             except Exception:
                 pass
             self.stream = None
-        self.is_playing = False
+            self._stream_sig = None
 
     def seek(self, seconds):
         if self.data is None:
             return
-        frame = int(seconds * self.samplerate)
-        with self._lock:
-            self.position = max(0, min(frame, len(self.data)))
+        frame = max(0, min(int(seconds * self.samplerate), len(self.data)))
+        if self.is_playing:
+            self._pending_seek = frame
+        else:
+            self._pending_seek = None
+            self.position = frame
 
     def get_position(self):
-        with self._lock:
-            return self.position / self.samplerate if self.data is not None else 0.0
+        return self.position / self.samplerate if self.data is not None else 0.0
 
     def get_duration(self):
         return len(self.data) / self.samplerate if self.data is not None else 0.0
 
     def get_output_level(self):
-        chunk = self._last_chunk
-        if chunk is None or len(chunk) == 0:
-            return 0.0
-        rms = np.sqrt(np.mean(chunk**2))
-        return min(rms * 5, 1.0)
+        return float(self._output_level[0])
+
+class ExportSignals(QObject):
+    export_finished = pyqtSignal(str)
+    export_failed = pyqtSignal(str)
+
+class ExportWorker(QRunnable):
+    """Mix the trimmed track with a vocal take and write it, off the GUI thread."""
+
+    def __init__(self, input_file, track, samplerate, start_frame, end_frame,
+                 vocal_path, file_path, track_vol, vocal_vol, vocal=None, vocal_sr=None):
+        super().__init__()
+        self.signals = ExportSignals()
+        self.input_file = input_file
+        # Decoded (frames, channels) section, or None to read it from input_file
+        self.track = track
+        self.samplerate = samplerate
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+        self.vocal_path = vocal_path
+        # In-memory (frames, channels) take, or None to stream vocal_path
+        self.vocal = vocal
+        self.vocal_sr = vocal_sr
+        self.file_path = file_path
+        self.track_vol = track_vol
+        self.vocal_vol = vocal_vol
+        self._cancelled = False
+        # Set once run() has returned, so a closing dialog can wait for it
+        self.done = threading.Event()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        vocal_file = None
+        try:
+            if self._cancelled:
+                return
+            track = self.track
+            sr = self.samplerate
+            if track is None:
+                # Nothing cached yet, so decode only the trimmed section
+                track, sr = sf.read(
+                    self.input_file, start=self.start_frame, stop=self.end_frame,
+                    dtype="float32", always_2d=True,
+                )
+
+            vocal, vocal_sr = self.vocal, self.vocal_sr
+            if vocal is None:
+                vocal_file = sf.SoundFile(self.vocal_path)
+                vocal, vocal_sr = vocal_file, vocal_file.samplerate
+            if vocal_sr != sr:
+                # Only a rate mismatch pays for a full decode of the take
+                if vocal_file is not None:
+                    vocal = vocal_file.read(dtype="float32", always_2d=True)
+                vocal = self._resample(vocal, vocal_sr, sr)
+
+            vocal_channels = vocal.channels if vocal is vocal_file else vocal.shape[1]
+            channels = max(track.shape[1], vocal_channels)
+            scratch = np.empty((EXPORT_BLOCK_FRAMES, channels), dtype=np.float32)
+            vocal_scratch = np.empty((EXPORT_BLOCK_FRAMES, vocal_channels), dtype=np.float32)
+
+            # Pass 1: find the mix peak without keeping the mix around
+            max_val = 0.0
+            for block in self._mix_blocks(track, vocal, self.track_vol, self.vocal_vol, scratch, vocal_scratch):
+                if self._cancelled:
+                    return
+                max_val = max(max_val, -float(block.min()), float(block.max()))
+
+            # Normalize to prevent clipping
+            gain = 0.95 / max_val if max_val > 0.5 else 1.0
+
+            # Pass 2: remix block by block, scale and stream to disk
+            if vocal is vocal_file:
+                vocal_file.seek(0)
+            with sf.SoundFile(self.file_path, "w", sr, channels) as out_file:
+                for block in self._mix_blocks(track, vocal, self.track_vol, self.vocal_vol, scratch, vocal_scratch):
+                    if self._cancelled:
+                        break
+                    if gain != 1.0:
+                        block *= gain
+                    out_file.write(block)
+            if self._cancelled:
+                # Don't leave a half-written mix behind
+                os.remove(self.file_path)
+                return
+            self.signals.export_finished.emit(self.file_path)
+        except Exception as e:
+            self.signals.export_failed.emit(str(e))
+        finally:
+            if vocal_file is not None:
+                vocal_file.close()
+            self.done.set()
+
+    @staticmethod
+    def _resample(data, orig_sr, target_sr):
+        """Resample a (frames, channels) float32 array to target_sr."""
+        import torch
+        import torchaudio.functional as F
+        resampled = F.resample(torch.from_numpy(np.ascontiguousarray(data.T)), orig_sr, target_sr)
+        return np.ascontiguousarray(resampled.numpy().T)
+
+    @staticmethod
+    def _mix_blocks(track, vocal, track_vol, vocal_vol, scratch, vocal_scratch):
+        """Yield track*track_vol + vocal*vocal_vol in scratch-sized blocks.
+
+        vocal is either an array at the track's rate or an open SoundFile read
+        as it goes; it is treated as silence past its end. Each yielded block
+        is a view into scratch.
+        """
+        block_frames = len(scratch)
+        from_file = not isinstance(vocal, np.ndarray)
+        for start in range(0, len(track), block_frames):
+            t = track[start:start + block_frames]
+            out = scratch[:len(t)]
+            np.multiply(t, track_vol, out=out)
+            if from_file:
+                v = vocal.read(len(t), dtype="float32", always_2d=True)
+            else:
+                v = vocal[start:start + len(t)]
+            if len(v):
+                v_scaled = vocal_scratch[:len(v)]
+                np.multiply(v, vocal_vol, out=v_scaled)
+                out[:len(v)] += v_scaled
+            yield out
 
 class RecordingBooth(QDialog):
     def __init__(self, input_file, output_dir, trim_start=0, trim_end=None, parent=None):
@@ -128,32 +298,53 @@ class RecordingBooth(QDialog):
         self.trim_end = trim_end
 
         self.audio_input_device_index = None
-        self.input_level = 0.0
-        self._level_lock = threading.Lock()
+        # Written by the meter callback, read by the GUI timer: a single
+        # float32 store/load needs no lock
+        self._input_level = np.zeros(1, dtype=np.float32)
         self.input_meter_stream = None
 
         self.recorded_vocal = None
         self.is_recording = False
-        self.recording_data = []
+        self.is_exporting = False
+        self._export_worker = None
         self._record_lock = threading.Lock()
         self.record_stream = None
         self.record_timer = None
         self.elapsed_seconds = 0
         self.max_record_seconds = 600
-        self.max_recording_chunks = self.max_record_seconds * 44
+        # Whole-take buffer, allocated on first record and reused; the
+        # callback copies into it at _rec_pos instead of appending blocks
+        self._rec_buf = None
+        self._rec_pos = 0
+        # (frames, 1) view of the last saved take in _rec_buf, so playback
+        # doesn't read back the file that was just written
+        self._take = None
 
         self.track_player = AudioPlayer()
         self.vocal_player = AudioPlayer()
-
-        self.track_player.load(self.input_file)
-        self.track_duration_seconds = self.track_player.get_duration()
+        self._last_track_vol_pct = -1
+        self._last_vocal_vol_pct = -1
+
+        # Header only; the samples are decoded on first Play/Record/Export
+        info = sf.info(self.input_file)
+        self.track_duration_seconds = info.frames / info.samplerate
+        # Decoded once; Play/Record hand the player views into this buffer
+        self._track_full = None
+        self._track_sr = info.samplerate
+        # Trim points as frame indices, resolved once for playback and export
+        self._start_frame = int(self.trim_start * self._track_sr) if self.trim_start else 0
+        self._end_frame = int(self.trim_end * self._track_sr) if self.trim_end else info.frames
         
         self.init_ui()
+        # The sliders get their initial value before being connected, so seed
+        # the players from them directly
+        self.on_track_volume_changed(self.track_volume_slider.value())
+        self.on_vocal_volume_changed(self.vocal_volume_slider.value())
         self.update_ui_state()
 
+        # Polls the players only while one is running; see _start_output_meter
         self.output_monitor_timer = QTimer()
         self.output_monitor_timer.timeout.connect(self.poll_output_level)
-        self.output_monitor_timer.start(100)
 
         self.input_monitor_timer = QTimer()
         self.input_monitor_timer.timeout.connect(self.update_input_meter)
@@ -277,56 +468,39 @@ class RecordingBooth(QDialog):
         self.input_selector.clear()
         self.input_selector.addItem("None")
         try:
+            # One PortAudio enumeration; each entry carries its device index
             devices = sd.query_devices()
             for i, d in enumerate(devices):
                 if d.get('max_input_channels', 0) > 0:
-                    self.input_selector.addItem(f"{d['name']}")
+                    self.input_selector.addItem(f"{d['name']}", i)
         except Exception as e:
             self.input_selector.addItem("No devices found")
 
     def on_input_selected(self, idx):
-        selected_text = self.input_selector.currentText()
-        with self._level_lock:
-            self.input_level = 0.0
+        device_index = self.input_selector.currentData()
+        self._input_level[0] = 0.0
         self.input_meter.update_levels([0.0])
-        if selected_text == "None" or "No devices" in selected_text:
+        if device_index is None:
             self.audio_input_device_index = None
             self.input_monitor_timer.stop()
             self.stop_input_meter_stream()
             self.status_label.setText("No input selected - recording disabled")
         else:
-            self.audio_input_device_index = self._find_device_index(selected_text)
-            if self.audio_input_device_index is not None:
-                self.start_input_meter_stream()
-                self.input_monitor_timer.start(50)
-                self.status_label.setText("Input ready - you can now record")
-            else:
-                self.status_label.setText("Input device not found")
+            self.audio_input_device_index = device_index
+            self.start_input_meter_stream()
+            self.input_monitor_timer.start(METER_INTERVAL_MS)
+            self.status_label.setText("Input ready - you can now record")
         self.update_ui_state()
 
-    def _find_device_index(self, device_name):
-        try:
-            devices = sd.query_devices()
-            for i, d in enumerate(devices):
-                if device_name in d.get('name', '') and d.get('max_input_channels', 0) > 0:
-                    return i
-        except Exception as e:
-            print(f"Error finding device index: {e}")
-        return None
-
     def update_input_meter(self):
-        with self._level_lock:
-            current_level = self.input_level
-        self.input_meter.update_levels([current_level])
+        self.input_meter.update_levels([float(self._input_level[0])])
 
     def start_input_meter_stream(self):
         if self.audio_input_device_index is None:
             return
         def meter_callback(indata, frames, time, status):
             try:
-                rms = np.sqrt(np.mean(indata ** 2))
-                with self._level_lock:
-                    self.input_level = min(rms * 5, 1.0)
+                self._input_level[0] = min(_rms(indata) * 5, 1.0)
             except Exception:
                 pass
         try:
@@ -336,7 +510,8 @@ class RecordingBooth(QDialog):
                 samplerate=44100,
                 callback=meter_callback,
                 dtype='float32',
-                blocksize=1024
+                blocksize=METER_BLOCK_FRAMES,
+                latency="high",
             )
             self.input_meter_stream.start()
         except Exception as e:
@@ -352,21 +527,33 @@ class RecordingBooth(QDialog):
         except Exception:
             self.input_meter_stream = None
 
+    def _start_output_meter(self):
+        if not self.output_monitor_timer.isActive():
+            self.output_monitor_timer.start(100)
+
     def poll_output_level(self):
-        level = 0.0
         if self.track_player.is_playing:
             level = self.track_player.get_output_level()
         elif self.vocal_player.is_playing:
             level = self.vocal_player.get_output_level()
+        else:
+            # Nothing playing: drop the meter to zero (LevelMeter animates the
+            # falloff itself) and stop waking up until the next play
+            self.output_meter.update_levels([0.0])
+            self.output_monitor_timer.stop()
+            return
         self.output_meter.update_levels([level])
 
     def update_ui_state(self):
         has_input = self.audio_input_device_index is not None
-        self.record_btn.setEnabled(has_input and not self.is_recording)
+        # An export may still be reading the take out of _rec_buf
+        self.record_btn.setEnabled(has_input and not self.is_recording and not self.is_exporting)
         self.stop_btn.setVisible(self.is_recording)
         self.cancel_btn.setVisible(self.is_recording)
         self.play_vocal_btn.setEnabled(has_input and self.recorded_vocal is not None and not self.is_recording)
-        self.export_btn.setEnabled(self.recorded_vocal is not None and not self.is_recording)
+        self.export_btn.setEnabled(
+            self.recorded_vocal is not None and not self.is_recording and not self.is_exporting
+        )
         self.play_track_btn.setEnabled(not self.is_recording)
         
         if not has_input:
@@ -377,10 +564,17 @@ class RecordingBooth(QDialog):
             self.play_vocal_btn.setStyleSheet("")
 
     def on_track_volume_changed(self, value):
-        self.track_player.volume = value / 100.0
+        # Drags emit per pixel; only touch the player when the step changes
+        if value == self._last_track_vol_pct:
+            return
+        self._last_track_vol_pct = value
+        self.track_player.volume = np.float32(value / 100.0)
 
     def on_vocal_volume_changed(self, value):
-        self.vocal_player.volume = value / 100.0
+        if value == self._last_vocal_vol_pct:
+            return
+        self._last_vocal_vol_pct = value
+        self.vocal_player.volume = np.float32(value / 100.0)
 
     def on_play_pause_track(self):
         """Play the trimmed section of the track"""
@@ -389,28 +583,43 @@ class RecordingBooth(QDialog):
             self.play_track_btn.setText("Play Track Section")
             self.status_label.setText("Track paused.")
         else:
-            # Load and trim the track to the specified section
-            self.track_player.load(self.input_file)
-            self.track_player.trim(self.trim_start, self.trim_end)
+            # Play the trimmed section from the cached decode
+            self.track_player.set_data(self._track_section(), self._track_sr)
             self.track_player.play()
+            self._start_output_meter()
             self.play_track_btn.setText("Pause Track")
             self.status_label.setText(f"Playing track section ({self.trim_start}s to {self.trim_end if self.trim_end else 'end'}s)")
 
+    def _track_section(self):
+        """View of the cached backing track between the trim points."""
+        if self._track_full is None:
+            self._track_full, _ = sf.read(self.input_file, dtype="float32", always_2d=True)
+        return self._track_full[self._start_frame:self._end_frame]
+
     def on_record(self):
         """Start recording with backing track"""
         # Start backing track for timing
-        self.track_player.load(self.input_file)
-        self.track_player.trim(self.trim_start, self.trim_end)
+        self.track_player.set_data(self._track_section(), self._track_sr)
         self.track_player.play()
+        self._start_output_meter()
         
-        # Stop input monitoring during recording
-        self.input_monitor_timer.stop()
+        # The new take overwrites _rec_buf, which the vocal player may be reading
+        self.vocal_player.stop()
+        self.play_vocal_btn.setText("Play Vocal")
+        self._take = None
+        
+        # The record stream feeds the input meter while a take runs, so the
+        # separate meter stream isn't left capturing the same device
+        self.stop_input_meter_stream()
         
         self.is_recording = True
         self.status_label.setText("Recording... (max 10:00)")
         self.elapsed_seconds = 0
         self.recording_timer_label.setText("Recording: 00:00 / 10:00")
-        self.recording_data = []
+        if self._rec_buf is None:
+            # The take is mono, so keep it as a flat 1-D buffer
+            self._rec_buf = np.empty(self.max_record_seconds * 44100, dtype=np.float32)
+        self._rec_pos = 0
         self._record_lock = threading.Lock()
         self.update_ui_state()
         
@@ -420,10 +629,13 @@ class RecordingBooth(QDialog):
                     if status:
                         print(f"Recording status: {status}")
                     with self._record_lock:
-                        if len(self.recording_data) < self.max_recording_chunks:
-                            self.recording_data.append(indata.copy())
-                        else:
-                            print("Warning: Recording buffer full, dropping frames")
+                        pos = self._rec_pos
+                        n = min(frames, len(self._rec_buf) - pos)
+                        self._rec_buf[pos:pos + n] = indata[:n, 0]
+                        self._rec_pos = pos + n
+                    self._input_level[0] = min(_rms(indata) * 5, 1.0)
+                    if n < frames:
+                        print("Warning: Recording buffer full, dropping frames")
                 except Exception as e:
                     print(f"Recording callback error: {e}")
                     
@@ -433,7 +645,8 @@ class RecordingBooth(QDialog):
                 samplerate=44100,
                 callback=record_callback,
                 dtype='float32',
-                blocksize=1024
+                blocksize=0,
+                latency=INPUT_LATENCY,
             )
             
             self.record_stream.start()
@@ -450,6 +663,7 @@ class RecordingBooth(QDialog):
             self.status_label.setText("Recording failed.")
             self.is_recording = False
             self.update_ui_state()
+            self.start_input_meter_stream()
 
     def update_elapsed_time(self):
         self.elapsed_seconds += 1
@@ -484,20 +698,22 @@ class RecordingBooth(QDialog):
             print(f"Recording stream close error: {e}")
             
         if save:
+            fname = f"vocal_take_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_omotiv.wav"
+            vocal_path = os.path.join(self.output_dir, fname)
+            # The lock only covers the cursor snapshot, not the file write
             with self._record_lock:
-                if self.recording_data:
-                    recording = np.concatenate(self.recording_data, axis=0)
-                    fname = f"vocal_take_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_omotiv.wav"
-                    vocal_path = os.path.join(self.output_dir, fname)
-                    sf.write(vocal_path, recording, 44100)
-                    self.recorded_vocal = vocal_path
-                    status = f"Take saved as {os.path.basename(vocal_path)}"
-                    if auto:
-                        status += " (auto-stopped at 10:00)"
-                    self.status_label.setText(status)
-                else:
-                    self.status_label.setText("No audio recorded.")
-                    self.recorded_vocal = None
+                rec_len = self._rec_pos
+            if rec_len:
+                sf.write(vocal_path, self._rec_buf[:rec_len], 44100)
+                self.recorded_vocal = vocal_path
+                self._take = self._rec_buf[:rec_len, None]
+                status = f"Take saved as {fname}"
+                if auto:
+                    status += " (auto-stopped at 10:00)"
+                self.status_label.setText(status)
+            else:
+                self.status_label.setText("No audio recorded.")
+                self.recorded_vocal = None
         else:
             self.status_label.setText("Recording cancelled.")
             self.recorded_vocal = None
@@ -505,12 +721,14 @@ class RecordingBooth(QDialog):
         self.is_recording = False
         self.update_ui_state()
         
-        # Restart input monitoring
+        # Hand the input meter back to its own stream
+        self._input_level[0] = 0.0
         if self.audio_input_device_index is not None:
-            self.input_monitor_timer.start(50)
+            self.start_input_meter_stream()
+            self.input_monitor_timer.start(METER_INTERVAL_MS)
 
     def on_play_pause_vocal(self):
-        if not self.recorded_vocal or not os.path.exists(self.recorded_vocal):
+        if self._take is None and (not self.recorded_vocal or not os.path.exists(self.recorded_vocal)):
             QMessageBox.warning(self, "No Vocal Take", "No vocal recording available.")
             return
         if self.vocal_player.is_playing:
@@ -518,8 +736,12 @@ class RecordingBooth(QDialog):
             self.play_vocal_btn.setText("Play Vocal")
             self.status_label.setText("Vocal paused.")
         else:
-            self.vocal_player.load(self.recorded_vocal)
+            if self._take is not None:
+                self.vocal_player.set_data(self._take, 44100)
+            else:
+                self.vocal_player.load(self.recorded_vocal)
             self.vocal_player.play()
+            self._start_output_meter()
             self.play_vocal_btn.setText("Pause Vocal")
             self.status_label.setText("Playing vocal take...")
 
@@ -533,35 +755,37 @@ class RecordingBooth(QDialog):
         if not file_path:
             return
             
-        try:
-            track, sr_t = sf.read(self.input_file, always_2d=True)
-            vocal, sr_v = sf.read(self.recorded_vocal, always_2d=True)
-            sr = sr_t
-            
-            # Use trimmed segment for mix
-            start_frame = int(self.trim_start * sr)
-            end_frame = int(self.trim_end * sr) if self.trim_end else len(track)
-            track_trimmed = track[start_frame:end_frame]
-            
-            # Match vocal length to track section
-            vocal_trimmed = vocal[:end_frame-start_frame] if len(vocal) >= (end_frame-start_frame) else np.pad(vocal, ((0, (end_frame-start_frame)-len(vocal)), (0,0)))
-            
-            # Mix with volume controls
-            track_vol = self.track_volume_slider.value() / 100.0
-            vocal_vol = self.vocal_volume_slider.value() / 100.0
-            mix = (track_trimmed * track_vol) + (vocal_trimmed * vocal_vol)
-            
-            # Normalize to prevent clipping
-            max_val = np.abs(mix).max()
-            if max_val > 0.5:
-                mix = mix / max_val * 0.95
-                
-            sf.write(file_path, mix, sr)
-            self.status_label.setText(f"Exported mix to {os.path.basename(file_path)}")
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Export Error", str(e))
-            self.status_label.setText("Export failed.")
+        # Mixing and writing run on the pool so the dialog stays responsive;
+        # the cached decode and the in-memory take are reused when present
+        track = None
+        if self._track_full is not None:
+            track = self._track_full[self._start_frame:self._end_frame]
+        self._export_worker = ExportWorker(
+            self.input_file, track, self._track_sr, self._start_frame, self._end_frame,
+            self.recorded_vocal, file_path,
+            self.track_volume_slider.value() / 100.0,
+            self.vocal_volume_slider.value() / 100.0,
+            vocal=self._take, vocal_sr=44100,
+        )
+        self._export_worker.signals.export_finished.connect(self._on_export_finished)
+        self._export_worker.signals.export_failed.connect(self._on_export_failed)
+        self.is_exporting = True
+        self.update_ui_state()
+        self.status_label.setText("Exporting mix...")
+        QThreadPool.globalInstance().start(self._export_worker)
+
+    def _on_export_finished(self, file_path):
+        self.is_exporting = False
+        self._export_worker = None
+        self.update_ui_state()
+        self.status_label.setText(f"Exported mix to {os.path.basename(file_path)}")
+
+    def _on_export_failed(self, message):
+        self.is_exporting = False
+        self._export_worker = None
+        self.update_ui_state()
+        QMessageBox.critical(self, "Export Error", message)
+        self.status_label.setText("Export failed.")
 
     def update_track_info_label(self):
         """Display read-only track info based on trim settings from main page"""
@@ -586,6 +810,7 @@ class RecordingBooth(QDialog):
     def closeEvent(self, event):
         """Clean shutdown"""
         self.input_monitor_timer.stop()
+        self.output_monitor_timer.stop()
         self.elapsed_timer.stop()
         if hasattr(self, 'auto_stop_timer') and self.auto_stop_timer:
             self.auto_stop_timer.stop()
@@ -599,15 +824,32 @@ class RecordingBooth(QDialog):
                 pass
                 
         self.stop_input_meter_stream()
+        self._cancel_export()
         
-        # Stop any playing audio
-        if self.track_player.is_playing:
-            self.track_player.stop()
-        if self.vocal_player.is_playing:
-            self.vocal_player.stop()
+        # Stop any playing audio and release the output streams
+        self.track_player.close()
+        self.vocal_player.close()
             
         event.accept()
 
+    def reject(self):
+        # Esc hides a QDialog without a closeEvent; route it through close()
+        # so the streams and any running export are shut down too
+        self.close()
+
+    def _cancel_export(self):
+        """Stop a running export and wait for it, dropping its late signals."""
+        worker = self._export_worker
+        if worker is None:
+            return
+        worker.signals.export_finished.disconnect(self._on_export_finished)
+        worker.signals.export_failed.disconnect(self._on_export_failed)
+        worker.cancel()
+        # The worker checks the flag every block, so this returns promptly
+        worker.done.wait()
+        self._export_worker = None
+        self.is_exporting = False
+
 if __name__ == '__main__':
     app = QApplication(sys.argv)
     booth = RecordingBooth(
@@ -1,25 +1,68 @@
 import os
-import torch
-import torchaudio
 import numpy as np
 
 from PyQt6.QtWidgets import QWidget, QGroupBox, QVBoxLayout, QHBoxLayout, QPushButton, QLabel
-from PyQt6.QtCore import Qt, pyqtSignal, QPoint, QRectF
-from PyQt6.QtGui import QPainter, QColor, QPen, QPolygon, QBrush, QLinearGradient, QFont
+from PyQt6.QtCore import Qt, pyqtSignal, QLine, QRectF, QTimer
+from PyQt6.QtGui import QPainter, QColor, QPen, QPolygon, QBrush, QLinearGradient, QFont, QPixmap
+
+# The finest peak level has about this many buckets; each coarser level
+# halves it until fewer than MIN_PEAK_BUCKETS would remain
+PEAK_BUCKETS = 8192
+MIN_PEAK_BUCKETS = 256
+
+# Bars are drawn with one pen per amplitude bin rather than one per bar
+AMP_BINS = 16
+
+def build_peak_pyramid(mono):
+    """Min/max peak levels of a 1-D signal, finest first.
+
+    Each level is a float32 (mins, maxs, amps) triple of bucket arrays, amps
+    being the bucket's absolute peak, with half the buckets of the level
+    before it, so a repaint can pick the one closest to its width without
+    touching the samples again.
+    """
+    mono = np.asarray(mono, dtype=np.float32)
+    bucket = max(1, mono.size // PEAK_BUCKETS)
+    n = mono.size // bucket * bucket
+    frames = mono[:n].reshape(-1, bucket)
+    lo, hi = frames.min(axis=1), frames.max(axis=1)
+    levels = [(lo, hi, np.maximum(-lo, hi))]
+    while len(lo) >= 2 * MIN_PEAK_BUCKETS:
+        m = len(lo) // 2 * 2
+        lo = np.minimum(lo[0:m:2], lo[1:m:2])
+        hi = np.maximum(hi[0:m:2], hi[1:m:2])
+        levels.append((lo, hi, np.maximum(-lo, hi)))
+    return levels
 
 class WaveformWidget(QWidget):
     seek_requested = pyqtSignal(float)
 
     def __init__(self):
         super().__init__()
-        self.waveform_data = None
-        self.full_waveform = None
+        # (mins, maxs, amps) per level, finest first; empty until audio is loaded
+        self.peak_pyramid = []
+        # Source path; samples are re-read on demand rather than kept resident
+        self.audio_file = None
         self.sample_rate = 44100
         self.duration = 0.0
         self.playback_position = 0.0
         self.trim_start = None
         self.trim_end = None
         self.dragging_marker = None
+        # Pixel x of the trim handles; refreshed by _update_handle_px whenever
+        # the trim points or the width change
+        self._x_start_px = 0.0
+        self._x_end_px = 0.0
+        # Background, grid and waveform rendered once per size; repaints only
+        # draw the trim/cursor overlay on top. Cleared on load and resize.
+        self._cached_layer = None
+        self._cache_key = None
+        # While a resize is in flight the layer is drawn one level coarser and
+        # redrawn at full detail once the size has settled
+        self._interacting = False
+        self._refine_timer = QTimer(self)
+        self._refine_timer.setSingleShot(True)
+        self._refine_timer.timeout.connect(self._refine_layer)
 
         self.bg_color = QColor(22, 22, 28)
         self.grid_color = QColor(40, 40, 50)
@@ -29,50 +72,87 @@ class WaveformWidget(QWidget):
         self.trim_end_color = QColor(255, 60, 80)
         self.cursor_color = QColor(255, 255, 255)
         self.cursor_glow = QColor(120, 200, 255, 120)
+        # Paint objects built once and reused by every repaint
+        self._grid_pen = QPen(self.grid_color, 1, Qt.PenStyle.DashLine)
+        self._empty_text_color = QColor(200, 200, 200)
+        self._empty_font = QFont("Arial", 16)
+        self._trim_fill = QColor(255, 255, 255, 30)
+        self._trim_start_brush = QBrush(self.trim_start_color)
+        self._trim_start_pen = QPen(self.trim_start_color, 2)
+        self._trim_end_brush = QBrush(self.trim_end_color)
+        self._trim_end_pen = QPen(self.trim_end_color, 2)
+        self._handle_text_color = QColor(22, 22, 28)
+        self._handle_font = QFont("Arial", 14, QFont.Weight.Bold)
+        self._cursor_glow_pen = QPen(self.cursor_glow, 8)
+        self._cursor_pen = QPen(self.cursor_color, 2)
+        self._bar_pens = [self._bar_pen((b + 0.5) / AMP_BINS) for b in range(AMP_BINS)]
         self.setMinimumHeight(180)
 
+    @staticmethod
+    def _bar_pen(amp):
+        return QPen(QColor.fromRgbF(
+            0.2 + 0.8 * amp,
+            0.2 + 0.2 * (1 - amp),
+            0.85 - 0.4 * amp,
+            0.55 + 0.45 * amp
+        ), 2)
+
     def load_audio(self, file_path):
         try:
+            import torchaudio
             waveform, sr = torchaudio.load(file_path)
-            if waveform.shape[0] > 1:
-                waveform = torch.mean(waveform, dim=0, keepdim=True)
+            # Only the 1-D mono signal is needed, so mix it down on the NumPy view
+            samples = waveform.numpy()
+            mono = samples[0] if samples.shape[0] == 1 else samples.mean(axis=0)
             self.sample_rate = sr
-            self.duration = waveform.shape[1] / sr
+            self.duration = samples.shape[1] / sr
 
-            downsample_factor = max(1, waveform.shape[1] // 4000)
-            self.waveform_data = waveform[0][::downsample_factor].numpy()
-            self.full_waveform = waveform.numpy()
+            self.peak_pyramid = build_peak_pyramid(mono)
+            self.audio_file = file_path
 
             self.trim_start = 0.0
             self.trim_end = self.duration
+            self._update_handle_px()
+            self._cached_layer = None
             self.update()
             return True
         except Exception as e:
             print(f"Error loading audio: {e}")
             return False
 
+    def read_range(self, t0, t1):
+        """Decode the (channels, frames) samples between t0 and t1 seconds."""
+        import torchaudio
+        frame_offset = int(t0 * self.sample_rate)
+        num_frames = max(0, int(t1 * self.sample_rate) - frame_offset)
+        waveform, _ = torchaudio.load(self.audio_file, frame_offset=frame_offset, num_frames=num_frames)
+        return waveform
+
     def set_playback_position(self, position_seconds):
+        old = self.playback_position
         self.playback_position = max(0.0, min(self.duration, position_seconds))
-        self.update()
+        if not self.peak_pyramid or self.playback_position == old:
+            return
+        # Dirty only the bands under the old and new cursor; the rest of the
+        # widget is unchanged and Qt clips the repaint to them
+        h = self.height()
+        for t in (old, self.playback_position):
+            x = int(self.time_to_x(t))
+            self.update(x - 8, 0, 16, h)
 
     def get_trim_range(self):
         return (self.trim_start, self.trim_end)
 
     def mousePressEvent(self, event):
-        if self.waveform_data is None:
+        if not self.peak_pyramid:
             return
         x = event.position().x()
-        t = self.x_to_time(x)
-
-        x_start = self.time_to_x(self.trim_start)
-        x_end = self.time_to_x(self.trim_end)
-
-        if abs(x - x_start) < 16:
+        if self._x_start_px - 16 < x < self._x_start_px + 16:
             self.dragging_marker = "start"
-        elif abs(x - x_end) < 16:
+        elif self._x_end_px - 16 < x < self._x_end_px + 16:
             self.dragging_marker = "end"
         else:
-            self.seek_requested.emit(t)
+            self.seek_requested.emit(self.x_to_time(x))
 
     def mouseMoveEvent(self, event):
         if not self.dragging_marker:
@@ -82,11 +162,29 @@ class WaveformWidget(QWidget):
             self.trim_start = max(0.0, min(t, self.trim_end - 0.1))
         elif self.dragging_marker == "end":
             self.trim_end = min(self.duration, max(t, self.trim_start + 0.1))
+        self._update_handle_px()
         self.update()
 
     def mouseReleaseEvent(self, event):
         self.dragging_marker = None
 
+    def peak_level(self, draw_width, coarser=0):
+        """Coarsest pyramid level that still has a bucket per pixel column.
+
+        Level k has len(finest) >> k buckets, so this is the mipmap lookup
+        floor(log2(len(finest) / draw_width)), clamped to the levels built.
+        """
+        finest = len(self.peak_pyramid[0][0])
+        ratio = finest // max(1, draw_width)
+        level = min(len(self.peak_pyramid) - 1, max(0, ratio.bit_length() - 1) + coarser)
+        return self.peak_pyramid[level]
+
+    def seconds_per_pixel(self):
+        widget_width = self.width() - 80
+        if widget_width <= 0 or self.duration <= 0:
+            return 0.0
+        return self.duration / widget_width
+
     def x_to_time(self, x):
         widget_width = self.width() - 80
         return (x - 40) / widget_width * self.duration
@@ -95,29 +193,51 @@ class WaveformWidget(QWidget):
         widget_width = self.width() - 80
         return 40 + (t / self.duration * widget_width)
 
-    def paintEvent(self, event):
-        p = QPainter(self)
+    def _update_handle_px(self):
+        if self.duration > 0 and self.trim_start is not None and self.trim_end is not None:
+            self._x_start_px = self.time_to_x(self.trim_start)
+            self._x_end_px = self.time_to_x(self.trim_end)
+
+    def resizeEvent(self, event):
+        self._cached_layer = None
+        self._update_handle_px()
+        if self.peak_pyramid:
+            self._interacting = True
+            self._refine_timer.start(120)
+        super().resizeEvent(event)
+
+    def _refine_layer(self):
+        self._interacting = False
+        self._cached_layer = None
+        self.update()
+
+    def _render_layer(self, w, h, dpr):
+        """Draw the background, grid and waveform into a pixmap of the widget size."""
+        layer = QPixmap(max(1, int(w * dpr)), max(1, int(h * dpr)))
+        layer.setDevicePixelRatio(dpr)
+        p = QPainter(layer)
         p.setRenderHint(QPainter.RenderHint.Antialiasing)
-        w, h = self.width(), self.height()
-        p.fillRect(self.rect(), self.bg_color)
+        p.fillRect(0, 0, w, h, self.bg_color)
 
         grid_steps = 8
-        for i in range(grid_steps + 1):
-            gx = int(40 + (w - 80) * i / grid_steps)
-            p.setPen(QPen(self.grid_color, 1, Qt.PenStyle.DashLine))
-            p.drawLine(gx, 0, gx, h)
-
-        if self.waveform_data is None:
-            p.setPen(QColor(200, 200, 200))
-            p.setFont(QFont("Arial", 16))
-            p.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "No audio loaded")
-            return
+        grid_xs = [int(40 + (w - 80) * i / grid_steps) for i in range(grid_steps + 1)]
+        p.setPen(self._grid_pen)
+        p.drawLines([QLine(gx, 0, gx, h) for gx in grid_xs])
+
+        if not self.peak_pyramid:
+            p.setPen(self._empty_text_color)
+            p.setFont(self._empty_font)
+            p.drawText(QRectF(0, 0, w, h), Qt.AlignmentFlag.AlignCenter, "No audio loaded")
+            p.end()
+            return layer
 
         center_y = h // 2
         draw_width = w - 80
         scale = (h // 2) * 0.8
 
-        step = max(1, len(self.waveform_data) // draw_width)
+        lo, hi, amp = self.peak_level(draw_width, 1 if self._interacting else 0)
+        n = len(lo)
+        step = max(1, n // draw_width)
 
         gradient = QLinearGradient(40, 0, w - 40, 0)
         gradient.setColorAt(0.0, self.waveform_gradient_start)
@@ -125,55 +245,86 @@ class WaveformWidget(QWidget):
         p.setPen(QPen(Qt.GlobalColor.transparent))
         p.setBrush(QBrush(gradient))
 
-        points = []
-        for i in range(0, len(self.waveform_data), step):
-            x = 40 + (i / len(self.waveform_data)) * draw_width
-            y = int(center_y - self.waveform_data[i] * scale)
-            points.append(QPoint(int(x), y))
-        if points:
-            path = QPolygon(points)
-            p.setPen(QPen(gradient, 2))
-            p.drawPolyline(path)
-
-        for i in range(0, len(self.waveform_data), step):
-            x = 40 + (i / len(self.waveform_data)) * draw_width
-            y = int(center_y - self.waveform_data[i] * scale)
-            amp = abs(self.waveform_data[i])
-            color = QColor.fromRgbF(
-                0.2 + 0.8 * amp,
-                0.2 + 0.2 * (1 - amp),
-                0.85 - 0.4 * amp,
-                0.55 + 0.45 * amp
-            )
-            p.setPen(QPen(color, 2))
-            p.drawLine(int(x), center_y, int(x), y)
+        # Geometry for every bucket in one pass of array math, shared by the
+        # envelopes and the bars
+        idx = np.arange(0, n, step)
+        bar_lo, bar_hi = lo[idx], hi[idx]
+        xs = (40 + idx / n * draw_width).astype(np.int32)
+        ys_hi = (center_y - bar_hi * scale).astype(np.int32)
+        ys_lo = (center_y - bar_lo * scale).astype(np.int32)
+
+        # Upper and lower envelopes of the chosen level, filled from one
+        # interleaved x,y buffer instead of a QPoint per bucket
+        p.setPen(QPen(gradient, 2))
+        if len(idx):
+            xy = np.empty((len(idx), 2), dtype=np.int32)
+            xy[:, 0] = xs
+            for ys in (ys_hi, ys_lo):
+                xy[:, 1] = ys
+                envelope = QPolygon()
+                envelope.setPoints(xy.ravel().tolist())
+                p.drawPolyline(envelope)
+
+        # One drawLines per amplitude bin so the pen changes at most AMP_BINS times
+        amps = amp[idx]
+        bins = np.minimum((amps * AMP_BINS).astype(np.int32), AMP_BINS - 1)
+        order = np.argsort(bins, kind="stable")
+        counts = np.bincount(bins, minlength=AMP_BINS)
+
+        lines = [QLine(x, y0, x, y1) for x, y0, y1 in
+                 zip(xs[order].tolist(), ys_lo[order].tolist(), ys_hi[order].tolist())]
+        start = 0
+        for b, count in enumerate(counts.tolist()):
+            if count:
+                p.setPen(self._bar_pens[b])
+                p.drawLines(lines[start:start + count])
+                start += count
+
+        p.end()
+        return layer
+
+    def paintEvent(self, event):
+        w, h = self.width(), self.height()
+        dpr = self.devicePixelRatioF()
+        key = (w, h, dpr)
+        if self._cached_layer is None or self._cache_key != key:
+            self._cached_layer = self._render_layer(w, h, dpr)
+            self._cache_key = key
+
+        p = QPainter(self)
+        # Blit just the exposed part of the layer (the pixmap is in device pixels)
+        r = event.rect()
+        p.drawPixmap(QRectF(r), self._cached_layer,
+                     QRectF(r.x() * dpr, r.y() * dpr, r.width() * dpr, r.height() * dpr))
+        if not self.peak_pyramid:
+            return
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        center_y = h // 2
 
         if self.trim_start is not None and self.trim_end is not None:
-            x1, x2 = self.time_to_x(self.trim_start), self.time_to_x(self.trim_end)
-            p.fillRect(int(x1), 0, int(x2 - x1), h, QColor(255, 255, 255, 30))
+            x1, x2 = self._x_start_px, self._x_end_px
+            p.fillRect(int(x1), 0, int(x2 - x1), h, self._trim_fill)
 
-            p.setBrush(QBrush(self.trim_start_color))
-            p.setPen(QPen(self.trim_start_color, 2))
+            p.setBrush(self._trim_start_brush)
+            p.setPen(self._trim_start_pen)
             handle_w = 12
             handle_rect = QRectF(x1 - handle_w // 2, center_y - 24, handle_w, 48)
             p.drawRoundedRect(handle_rect, 6, 6)
-            p.setPen(QColor(22, 22, 28))
-            p.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+            p.setPen(self._handle_text_color)
+            p.setFont(self._handle_font)
             p.drawText(handle_rect, Qt.AlignmentFlag.AlignCenter, "S")
 
-            p.setBrush(QBrush(self.trim_end_color))
-            p.setPen(QPen(self.trim_end_color, 2))
+            p.setBrush(self._trim_end_brush)
+            p.setPen(self._trim_end_pen)
             handle_rect2 = QRectF(x2 - handle_w // 2, center_y - 24, handle_w, 48)
             p.drawRoundedRect(handle_rect2, 6, 6)
-            p.setPen(QColor(22, 22, 28))
-            p.setFont(QFont("Arial", 14, QFont.Weight.Bold))
+            p.setPen(self._handle_text_color)
             p.drawText(handle_rect2, Qt.AlignmentFlag.AlignCenter, "E")
 
         cursor_x = self.time_to_x(self.playback_position)
-        glow_width = 8
-        p.setPen(QPen(self.cursor_glow, glow_width))
+        p.setPen(self._cursor_glow_pen)
         p.drawLine(int(cursor_x), 0, int(cursor_x), h)
-        p.setPen(QPen(self.cursor_color, 2))
+        p.setPen(self._cursor_pen)
         p.drawLine(int(cursor_x), 0, int(cursor_x), h)
 
 class AudioEditorSection(QGroupBox):
@@ -218,6 +369,13 @@ class AudioEditorSection(QGroupBox):
     def update_playback_position(self, pos_sec):
         self.waveform.set_playback_position(pos_sec)
 
+    def cursor_interval_ms(self, fallback=50):
+        """Milliseconds the playback cursor needs to advance one pixel."""
+        spp = self.waveform.seconds_per_pixel()
+        if not spp:
+            return fallback
+        return max(16, min(250, int(1000 * spp)))
+
     def set_play_button_state(self, is_playing: bool):
         if is_playing:
             self.play_pause_btn.setText("⏸️ Pause")